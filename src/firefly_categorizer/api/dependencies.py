@@ -1,46 +1,51 @@
-from fastapi import HTTPException, Request
+from fastapi import HTTPException
 
+from firefly_categorizer.api.state import Runtime, services
 from firefly_categorizer.integration.firefly import FireflyClient
 from firefly_categorizer.manager import CategorizerService
 from firefly_categorizer.services.categorization import CategorizationPipeline
 from firefly_categorizer.services.training import TrainingManager
 
 
-def get_service(request: Request) -> CategorizerService:
-    service = getattr(request.app.state, "service", None)
+async def get_service() -> CategorizerService:
+    service = services.service
     if not service:
         raise HTTPException(status_code=500, detail="Service not initialized")
     return service
 
 
-def get_service_optional(request: Request) -> CategorizerService | None:
-    return getattr(request.app.state, "service", None)
+async def get_service_optional() -> CategorizerService | None:
+    return services.service
 
 
-def get_firefly_optional(request: Request) -> FireflyClient | None:
-    return getattr(request.app.state, "firefly", None)
+async def get_firefly_optional() -> FireflyClient | None:
+    return services.firefly
 
 
-def get_firefly(request: Request) -> FireflyClient:
-    firefly = getattr(request.app.state, "firefly", None)
+async def get_firefly() -> FireflyClient:
+    firefly = services.firefly
     if not firefly:
         raise HTTPException(status_code=500, detail="Firefly not configured")
     return firefly
 
 
-def get_training_manager(request: Request) -> TrainingManager:
-    manager = getattr(request.app.state, "training_manager", None)
+async def get_training_manager() -> TrainingManager:
+    manager = services.training_manager
     if not manager:
         raise HTTPException(status_code=500, detail="Service not initialized")
     return manager
 
 
-def get_pipeline(request: Request) -> CategorizationPipeline:
-    pipeline = getattr(request.app.state, "pipeline", None)
+async def get_pipeline() -> CategorizationPipeline:
+    pipeline = services.pipeline
     if not pipeline:
         raise HTTPException(status_code=500, detail="Service not initialized")
     return pipeline
 
 
-def get_pipeline_optional(request: Request) -> CategorizationPipeline | None:
-    return getattr(request.app.state, "pipeline", None)
+async def get_pipeline_optional() -> CategorizationPipeline | None:
+    return services.pipeline
+
+
+async def get_runtime_optional() -> Runtime | None:
+    return services.runtime()
@@ -1,22 +1,37 @@
 import os
-from datetime import datetime, timedelta
+from datetime import date
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from firefly_categorizer.api.dependencies import get_firefly_optional
+from firefly_categorizer.api.state import services
 from firefly_categorizer.core import configuration
 from firefly_categorizer.integration.firefly import FireflyClient
-from firefly_categorizer.services.firefly_data import is_all_scope
+from firefly_categorizer.services.firefly_data import default_date_strings, is_all_scope
 
 router = APIRouter()
 
 templates_dir = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..", "..", "web", "templates")
 )
-templates = Jinja2Templates(directory=templates_dir)
+# Templates ship with the package, so skip per-render mtime checks and keep every
+# compiled template (there are only a handful) for the lifetime of the process.
+templates_env = Environment(
+    loader=FileSystemLoader(templates_dir),
+    autoescape=select_autoescape(),
+    auto_reload=False,
+    cache_size=-1,
+)
+templates = Jinja2Templates(env=templates_env)
+
+PAGE_TEMPLATES = ("index.html", "help.html", "train.html", "config.html")
+
+for template_name in PAGE_TEMPLATES:
+    templates_env.get_template(template_name)
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -27,10 +42,10 @@ async def index(
     end_date: str | None = None,
     scope: str | None = None,
 ) -> HTMLResponse:
-    if not start_date:
-        start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-    if not end_date:
-        end_date = datetime.now().strftime("%Y-%m-%d")
+    if not start_date or not end_date:
+        default_start, default_end = default_date_strings(date.today())
+        start_date = start_date or default_start
+        end_date = end_date or default_end
 
     scope_mode = "all" if is_all_scope(scope) else "range"
 
@@ -58,34 +73,28 @@ async def train_page(request: Request) -> HTMLResponse:
 
 @router.get("/config", response_class=HTMLResponse)
 async def config_page(request: Request, saved: bool = False) -> HTMLResponse:
-    context = configuration.build_config_context()
     status = "Configuration saved." if saved else None
+    return _render_config(request, status=status, errors={})
+
+
+@router.post("/config", response_class=HTMLResponse)
+async def save_config(request: Request) -> Response:
+    form = await request.form()
+    errors, updates = configuration.apply_config_updates(form)
+    if errors:
+        return _render_config(request, status=None, errors=errors)
+    await configuration.apply_runtime_updates(services, updates)
+    return RedirectResponse(url="/config?saved=1", status_code=303)
+
+
+def _render_config(request: Request, *, status: str | None, errors: dict[str, str]) -> HTMLResponse:
+    context = configuration.build_config_context(field_errors=errors or None)
     return templates.TemplateResponse(
         "config.html",
         {
             "request": request,
             "status": status,
-            "errors": {},
+            "errors": errors,
             **context,
         },
     )
-
-
-@router.post("/config", response_class=HTMLResponse)
-async def save_config(request: Request) -> Response:
-    form = await request.form()
-    payload = {key: str(value) for key, value in form.items()}
-    errors, updates = configuration.apply_config_updates(payload)
-    if errors:
-        context = configuration.build_config_context(field_errors=errors)
-        return templates.TemplateResponse(
-            "config.html",
-            {
-                "request": request,
-                "status": None,
-                "errors": errors,
-                **context,
-            },
-        )
-    configuration.apply_runtime_updates(request.app, updates)
-    return RedirectResponse(url="/config?saved=1", status_code=303)
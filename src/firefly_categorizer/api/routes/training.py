@@ -32,7 +32,11 @@ async def train_models(
 async def train_stream(
     training_manager: Annotated[TrainingManager, Depends(get_training_manager)],
 ) -> StreamingResponse:
-    return StreamingResponse(training_manager.stream(), media_type="text/event-stream")
+    return StreamingResponse(
+        training_manager.stream(),
+        media_type="text/event-stream",
+        headers=settings.SSE_HEADERS,
+    )
 
 
 @router.post("/train-pause")
@@ -92,8 +96,7 @@ async def learn_transaction(
 
     firefly_update_status = "skipped"
     if firefly and req.transaction_id:
-        manual_tags = settings.get_env_tags("MANUAL_TAGS")
-        tags_payload = merge_tags(req.existing_tags, manual_tags) if manual_tags else None
+        tags_payload = merge_tags(req.existing_tags, settings.MANUAL_TAGS) if settings.MANUAL_TAGS else None
         success = await firefly.update_transaction(
             req.transaction_id,
             req.category.name,
@@ -1,15 +1,19 @@
 import asyncio
-import json
+from collections.abc import AsyncGenerator
+from contextlib import aclosing, suppress
 from typing import Annotated, Any
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 
 from firefly_categorizer.api.dependencies import (
     get_firefly_optional,
     get_pipeline_optional,
-    get_service_optional,
+    get_runtime_optional,
 )
+from firefly_categorizer.api.schemas import PREDICTION_EVENT_ADAPTER
+from firefly_categorizer.api.state import Runtime
 from firefly_categorizer.core import settings
 from firefly_categorizer.domain.transactions import (
     build_transaction_payload,
@@ -17,75 +21,108 @@ from firefly_categorizer.domain.transactions import (
     build_transactions_display,
 )
 from firefly_categorizer.integration.firefly import FireflyClient
-from firefly_categorizer.manager import CategorizerService
 from firefly_categorizer.services.categorization import CategorizationPipeline
 from firefly_categorizer.services.firefly_data import fetch_category_names, resolve_date_range
 
 router = APIRouter()
 
 
+def _firefly_error(exc: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=502,
+        detail=f"Error communicating with Firefly: {exc!r}",
+    )
+
+
 @router.get("/api/categorize-stream")
 async def categorize_stream(
-    service: Annotated[CategorizerService | None, Depends(get_service_optional)],
-    firefly: Annotated[FireflyClient | None, Depends(get_firefly_optional)],
-    pipeline: Annotated[CategorizationPipeline | None, Depends(get_pipeline_optional)],
+    runtime: Annotated[Runtime | None, Depends(get_runtime_optional)],
     start_date: str | None = None,
     end_date: str | None = None,
     scope: str | None = None,
     page: int = 1,
     limit: int = 50,
 ) -> StreamingResponse:
-    async def generate() -> Any:
-        if not service or not firefly or not pipeline:
-            yield "data: {\"error\": \"Service not initialized\"}\n\n"
+    async def generate() -> AsyncGenerator[bytes, None]:
+        if runtime is None:
+            yield b'data: {"error": "Service not initialized"}\n\n'
             return
+        firefly, pipeline = runtime.firefly, runtime.pipeline
 
         start_date_obj, end_date_obj = resolve_date_range(start_date, end_date, scope)
 
         try:
-            result = await firefly.get_transactions(
-                start_date=start_date_obj,
-                end_date=end_date_obj,
-                page=page,
-                limit=limit,
+            result, category_list = await asyncio.gather(
+                firefly.get_transactions(
+                    start_date=start_date_obj,
+                    end_date=end_date_obj,
+                    page=page,
+                    limit=limit,
+                ),
+                fetch_category_names(firefly, sort=True),
             )
         except Exception as exc:
-            yield f"data: {json.dumps({'error': f'Error fetching transactions: {exc!r}'})}\n\n"
+            yield b"data: " + orjson.dumps({"error": f"Error fetching transactions: {exc!r}"}) + b"\n\n"
             return
 
         raw_txs = result.get("data", [])
-
-        category_list = await fetch_category_names(firefly, sort=True)
-        auto_approve_threshold = settings.get_env_float("AUTO_APPROVE_THRESHOLD", 0.0)
-
-        for idx, t_data in enumerate(raw_txs):
-            if idx % settings.STREAM_YIELD_EVERY == 0:
-                await asyncio.sleep(0)
-
-            snapshot = build_transaction_snapshot(t_data)
-            prediction, existing_cat, auto_approved = await pipeline.predict_for_snapshot(
-                snapshot,
-                valid_categories=category_list if category_list else None,
-                auto_approve_threshold=auto_approve_threshold,
-            )
-
-            payload = {
-                "id": snapshot.transaction_id,
-                "prediction": prediction.model_dump() if prediction else None,
-                "existing_category": existing_cat,
-                "auto_approved": auto_approved,
-            }
-
-            yield f"data: {json.dumps(payload)}\n\n"
-
-        yield "event: done\ndata: {}\n\n"
-
-    return StreamingResponse(generate(), media_type="text/event-stream", headers=settings.SSE_HEADERS)
+        if not raw_txs:
+            yield b"event: done\ndata: {}\n\n"
+            return
+        auto_approve_threshold = settings.AUTO_APPROVE_THRESHOLD
+
+        snapshots = [build_transaction_snapshot(t_data) for t_data in raw_txs]
+        predictions = pipeline.iter_snapshot_predictions(
+            snapshots,
+            valid_categories=category_list if category_list else None,
+            auto_approve_threshold=auto_approve_threshold,
+        )
+        async with aclosing(predictions):
+            async for snapshot, (prediction, existing_cat, auto_approved) in predictions:
+                event = PREDICTION_EVENT_ADAPTER.dump_json({
+                    "id": snapshot.transaction_id,
+                    "prediction": prediction,
+                    "existing_category": existing_cat,
+                    "auto_approved": auto_approved,
+                })
+
+                yield b"data: " + event + b"\n\n"
+
+        yield b"event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        _with_keepalive(generate(), settings.SSE_KEEPALIVE_SECONDS),
+        media_type="text/event-stream",
+        headers=settings.SSE_HEADERS,
+    )
+
+
+async def _with_keepalive(source: AsyncGenerator[bytes, None], interval: float) -> AsyncGenerator[bytes, None]:
+    """Send headers right away and emit SSE comments while the source is slow to produce."""
+    yield b": connected\n\n"
+    async with aclosing(source):
+        next_chunk = asyncio.ensure_future(anext(source))
+        try:
+            while True:
+                done, _ = await asyncio.wait({next_chunk}, timeout=interval)
+                if not done:
+                    yield b": keepalive\n\n"
+                    continue
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    return
+                yield chunk
+                next_chunk = asyncio.ensure_future(anext(source))
+        finally:
+            if not next_chunk.done():
+                next_chunk.cancel()
+                with suppress(asyncio.CancelledError, StopAsyncIteration):
+                    await next_chunk
 
 
 @router.get("/api/transactions")
 async def get_transactions(
-    service: Annotated[CategorizerService | None, Depends(get_service_optional)],
     firefly: Annotated[FireflyClient | None, Depends(get_firefly_optional)],
     pipeline: Annotated[CategorizationPipeline | None, Depends(get_pipeline_optional)],
     start_date: str | None = None,
@@ -94,58 +131,80 @@ async def get_transactions(
     predict: bool = False,
     page: int = 1,
     limit: int = 50,
+    all_pages: bool = False,
 ) -> dict[str, Any]:
     transactions_display: list[dict[str, Any]] = []
     category_list: list[str] = []
     pagination: dict[str, Any] = {}
 
     if firefly:
-        category_list = await fetch_category_names(firefly, sort=True)
-
         start_date_obj, end_date_obj = resolve_date_range(start_date, end_date, scope)
+        auto_approve_threshold = settings.AUTO_APPROVE_THRESHOLD
+
+        async def build_display(raw_txs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            if not predict:
+                if len(raw_txs) <= settings.INLINE_DISPLAY_MAX_ROWS:
+                    return build_transactions_display(raw_txs)
+                return await asyncio.to_thread(build_transactions_display, raw_txs)
+
+            snapshots = [build_transaction_snapshot(t_data) for t_data in raw_txs]
+            if pipeline:
+                results = await pipeline.predict_snapshots(
+                    snapshots,
+                    valid_categories=category_list if category_list else None,
+                    auto_approve_threshold=auto_approve_threshold,
+                )
+            else:
+                results = [(None, snapshot.category_name, False) for snapshot in snapshots]
+
+            return [
+                build_transaction_payload(
+                    snapshot,
+                    prediction=prediction,
+                    existing_category=existing_cat,
+                    auto_approved=auto_approved,
+                )
+                for snapshot, (prediction, existing_cat, auto_approved) in zip(snapshots, results, strict=True)
+            ]
 
-        try:
-            result = await firefly.get_transactions(
+        if all_pages:
+            # Pages are prefetched, so processing one overlaps the request for the next.
+            pages = firefly.iter_transactions_pages(
                 start_date=start_date_obj,
                 end_date=end_date_obj,
-                page=page,
                 limit=limit,
+                start_page=page,
             )
-        except Exception as exc:
-            raise HTTPException(
-                status_code=502,
-                detail=f"Error communicating with Firefly: {exc!r}",
-            ) from exc
-
-        raw_txs = result.get("data", [])
-        pagination = result.get("meta", {})
-
-        if not predict:
-            transactions_display = await asyncio.to_thread(build_transactions_display, raw_txs)
-        else:
-            auto_approve_threshold = settings.get_env_float("AUTO_APPROVE_THRESHOLD", 0.0)
-            for idx, t_data in enumerate(raw_txs):
-                if idx % settings.STREAM_YIELD_EVERY == 0:
-                    await asyncio.sleep(0)
-
-                snapshot = build_transaction_snapshot(t_data)
-                prediction = None
-                auto_approved = False
-
-                existing_cat = snapshot.category_name
-                if predict and service and pipeline:
-                    prediction, existing_cat, auto_approved = await pipeline.predict_for_snapshot(
-                        snapshot,
-                        valid_categories=category_list if category_list else None,
-                        auto_approve_threshold=auto_approve_threshold,
+            async with aclosing(pages):
+                try:
+                    result, category_list = await asyncio.gather(
+                        anext(pages, None),
+                        fetch_category_names(firefly, sort=True),
                     )
-
-                transactions_display.append(build_transaction_payload(
-                    snapshot,
-                    prediction=prediction,
-                    existing_category=existing_cat,
-                    auto_approved=auto_approved,
-                ))
+                except Exception as exc:
+                    raise _firefly_error(exc) from exc
+                while result is not None:
+                    transactions_display.extend(await build_display(result.get("data", [])))
+                    pagination = result.get("meta", {})
+                    try:
+                        result = await anext(pages, None)
+                    except Exception as exc:
+                        raise _firefly_error(exc) from exc
+        else:
+            try:
+                result, category_list = await asyncio.gather(
+                    firefly.get_transactions(
+                        start_date=start_date_obj,
+                        end_date=end_date_obj,
+                        page=page,
+                        limit=limit,
+                    ),
+                    fetch_category_names(firefly, sort=True),
+                )
+            except Exception as exc:
+                raise _firefly_error(exc) from exc
+            pagination = result.get("meta", {})
+            transactions_display = await build_display(result.get("data", []))
 
     return {
         "transactions": transactions_display,
@@ -1,8 +1,9 @@
+import asyncio
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 
-from firefly_categorizer.api.dependencies import get_firefly, get_pipeline, get_service
+from firefly_categorizer.api.dependencies import get_firefly, get_pipeline
 from firefly_categorizer.core import settings
 from firefly_categorizer.domain.transactions import (
     extract_webhook_transaction_id,
@@ -11,7 +12,6 @@ from firefly_categorizer.domain.transactions import (
 )
 from firefly_categorizer.integration.firefly import FireflyClient
 from firefly_categorizer.logger import get_logger
-from firefly_categorizer.manager import CategorizerService
 from firefly_categorizer.services.categorization import CategorizationPipeline
 from firefly_categorizer.services.firefly_data import fetch_category_names
 
@@ -23,7 +23,6 @@ router = APIRouter()
 @router.post("/webhook/firefly")
 async def firefly_webhook(
     request: Request,
-    service: Annotated[CategorizerService, Depends(get_service)],
     firefly: Annotated[FireflyClient, Depends(get_firefly)],
     pipeline: Annotated[CategorizationPipeline, Depends(get_pipeline)],
 ) -> dict[str, str]:
@@ -43,8 +42,13 @@ async def firefly_webhook(
 
     tx_id = extract_webhook_transaction_id(payload)
     snapshot = extract_webhook_transaction_snapshot(payload)
+    category_names: list[str] | None = None
     if not snapshot and tx_id:
-        snapshot = await firefly.get_transaction(tx_id)
+        # Categories are needed for prediction anyway; fetch them alongside the transaction.
+        snapshot, category_names = await asyncio.gather(
+            firefly.get_transaction(tx_id),
+            fetch_category_names(firefly),
+        )
 
     if not snapshot:
         logger.warning("[WEBHOOK] Missing transaction details; skipping.")
@@ -65,7 +69,9 @@ async def firefly_webhook(
         )
         return {"status": "ignored", "reason": "already categorized"}
 
-    valid_categories = await fetch_category_names(firefly)
+    if category_names is None:
+        category_names = await fetch_category_names(firefly)
+    valid_categories = category_names
     if not valid_categories:
         valid_categories = None
 
@@ -79,7 +85,7 @@ async def firefly_webhook(
         logger.info("[WEBHOOK] No prediction available for transaction %s; skipping.", tx_id)
         return {"status": "ignored", "reason": "no prediction"}
 
-    auto_approve_threshold = settings.get_env_float("AUTO_APPROVE_THRESHOLD", 0.0)
+    auto_approve_threshold = settings.AUTO_APPROVE_THRESHOLD
     reason, threshold_value = pipeline.auto_approval_reason(
         tx_id,
         prediction,
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from typing import TypedDict
 
-from firefly_categorizer.models import Category, Transaction
+from pydantic import BaseModel, TypeAdapter
+
+from firefly_categorizer.models import CategorizationResult, Category, Transaction
 
 
 class CategorizeRequest(BaseModel):
@@ -13,3 +15,14 @@ class LearnRequest(BaseModel):
     transaction_id: str | None = None
     suggested_category: str | None = None
     existing_tags: list[str] | None = None
+
+
+class PredictionEvent(TypedDict):
+    id: str | int | None
+    prediction: CategorizationResult | None
+    existing_category: str | None
+    auto_approved: bool
+
+
+# Built once so streamed events serialize straight to JSON bytes without model_dump().
+PREDICTION_EVENT_ADAPTER = TypeAdapter(PredictionEvent)
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from firefly_categorizer.integration.firefly import FireflyClient
+from firefly_categorizer.manager import CategorizerService
+from firefly_categorizer.services.categorization import CategorizationPipeline
+from firefly_categorizer.services.training import TrainingManager
+
+
+class Runtime(NamedTuple):
+    service: CategorizerService
+    firefly: FireflyClient
+    pipeline: CategorizationPipeline
+
+
+@dataclass
+class Services:
+    service: CategorizerService | None = None
+    firefly: FireflyClient | None = None
+    pipeline: CategorizationPipeline | None = None
+    training_manager: TrainingManager | None = None
+
+    def runtime(self) -> Runtime | None:
+        if not self.service or not self.firefly or not self.pipeline:
+            return None
+        return Runtime(self.service, self.firefly, self.pipeline)
+
+    def clear(self) -> None:
+        self.service = None
+        self.firefly = None
+        self.pipeline = None
+        self.training_manager = None
+
+
+# Populated once by the app lifespan; request dependencies read it directly.
+services = Services()
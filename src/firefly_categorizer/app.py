@@ -3,9 +3,11 @@ from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from firefly_categorizer.api.routes import categorize, pages, training, transactions, webhook
+from firefly_categorizer.api.state import services
 from firefly_categorizer.core import settings
 from firefly_categorizer.integration.firefly import FireflyClient
 from firefly_categorizer.logger import get_logger, setup_logging
@@ -17,6 +19,8 @@ logger = get_logger(__name__)
 
 
 def create_app() -> FastAPI:
+    # Before logging: LOG_LEVEL and LOG_DIR may come from .env or the config file
+    settings.init_settings()
     setup_logging()
 
     @asynccontextmanager
@@ -35,19 +39,27 @@ def create_app() -> FastAPI:
         training_manager = TrainingManager(service=service, firefly=firefly, page_size=settings.TRAINING_PAGE_SIZE)
         pipeline = CategorizationPipeline(service=service, firefly=firefly)
 
-        app.state.service = service
-        app.state.firefly = firefly
-        app.state.training_manager = training_manager
-        app.state.pipeline = pipeline
+        services.service = service
+        services.firefly = firefly
+        services.training_manager = training_manager
+        services.pipeline = pipeline
 
         logger.info("Services initialized.")
         try:
             yield
         finally:
+            services.clear()
             await firefly.aclose()
+            if service.llm:
+                await service.llm.aclose()
+            service.close()
             logger.info("Service shutting down.")
 
-    app = FastAPI(title="Firefly Categorizer", lifespan=lifespan)
+    app = FastAPI(
+        title="Firefly Categorizer",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
 
     static_dir = os.path.join(os.path.dirname(__file__), "web/static")
     if not os.path.exists(static_dir):
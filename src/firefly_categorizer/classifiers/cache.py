@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import numpy as np
+import orjson
+
+DEFAULT_CACHE_SIZE = 10_000
+
+
+class ResponseCache:
+    """Thread-safe LRU of raw LLM answers keyed by a digest of the exact request."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode())
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of LLM answers keyed by description embeddings.
+
+    Vectors live in a ring buffer capped at max_size and are searched by brute-force cosine
+    similarity, which stays well under a millisecond for a few thousand entries.
+    """
+
+    def __init__(self, threshold: float, max_size: int = DEFAULT_CACHE_SIZE):
+        self.threshold = threshold
+        self.max_size = max_size
+        self._vectors: np.ndarray | None = None
+        self._answers: list[str] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding: Sequence[float]) -> str | None:
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._vectors is None or not self._answers:
+                return None
+            similarities = self._vectors[:len(self._answers)] @ vector
+            best = int(similarities.argmax())
+            if similarities[best] < self.threshold:
+                return None
+            return self._answers[best]
+
+    def add(self, embedding: Sequence[float], answer: str) -> None:
+        if self.max_size <= 0:
+            return
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((min(self.max_size, 256), vector.shape[0]), dtype=np.float32)
+                self._answers = []
+                self._next = 0
+            elif self._next >= self._vectors.shape[0]:
+                # Grow geometrically until max_size, then wrap around as a ring buffer
+                grown = np.zeros((min(self.max_size, self._vectors.shape[0] * 2), vector.shape[0]), dtype=np.float32)
+                grown[:self._vectors.shape[0]] = self._vectors
+                self._vectors = grown
+            self._vectors[self._next] = vector
+            if self._next < len(self._answers):
+                self._answers[self._next] = answer
+            else:
+                self._answers.append(answer)
+            self._next = (self._next + 1) % self.max_size
+
+    def save(self, path: str, tag: str) -> None:
+        """
+        Write the cache to path.npy (float16 vectors) and path.json (answers).
+
+        tag identifies the embedding space (the model name); load ignores files with another tag.
+        """
+        with self._lock:
+            if self._vectors is None or not self._answers:
+                return
+            vectors = self._vectors[:len(self._answers)].astype(np.float16)
+            meta = {"tag": tag, "answers": list(self._answers), "next": self._next}
+        np.save(f"{path}.tmp.npy", vectors)
+        with open(f"{path}.json.tmp", "wb") as f:
+            f.write(orjson.dumps(meta))
+        os.replace(f"{path}.tmp.npy", f"{path}.npy")
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    def load(self, path: str, tag: str) -> bool:
+        if not (os.path.exists(f"{path}.npy") and os.path.exists(f"{path}.json")):
+            return False
+        with open(f"{path}.json", "rb") as f:
+            meta = orjson.loads(f.read())
+        # Memory-mapped, so only the rows kept below are ever read from disk
+        stored = np.load(f"{path}.npy", mmap_mode="r")
+        answers = meta.get("answers", [])
+        if meta.get("tag") != tag or stored.ndim != 2 or len(stored) != len(answers):
+            return False
+        keep = min(len(answers), self.max_size)
+        with self._lock:
+            self._vectors = np.zeros((max(keep, min(self.max_size, 256)), stored.shape[1]), dtype=np.float32)
+            self._vectors[:keep] = stored[:keep]
+            self._answers = answers[:keep]
+            self._next = meta.get("next", 0) % self.max_size if keep == self.max_size else keep
+        return True
+
+    def __len__(self) -> int:
+        return len(self._answers)
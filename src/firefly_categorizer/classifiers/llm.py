@@ -1,66 +1,455 @@
+import asyncio
+import hashlib
 import os
+import random
+import time
+from functools import lru_cache
+from typing import Any
 
-from openai import OpenAI
+import httpx
+import orjson
+from openai import AsyncOpenAI, OpenAI, RateLimitError
+from openai.types import Batch
+from openai.types.responses import Response
 
 from firefly_categorizer.logger import get_logger
-from firefly_categorizer.models import CategorizationResult, Category, Transaction
+from firefly_categorizer.models import CategorizationResult, Category, Transaction, category_named
 
 from .base import Classifier
+from .cache import DEFAULT_CACHE_SIZE, ResponseCache, SemanticCache
+from .rate_limit import TokenBucket
 
 logger = get_logger(__name__)
 
+BATCH_ENDPOINT = "/v1/responses"
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+DEFAULT_MAX_WORKERS = 64
+HTTP_KEEPALIVE_SECONDS = 60.0
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF_SECONDS = 1.0
+# Rough allowance for the short category-name answer when estimating tokens per request.
+COMPLETION_TOKEN_ESTIMATE = 16
+OPENAI_API_HOST = "api.openai.com"
+
+
+INSTRUCTIONS = (
+    "You are a helpful financial assistant. "
+    "Categorize the financial transaction you are given into a standard personal finance category.\n"
+    "Return ONLY the category name. If unsure or if it doesn't fit any valid category, return 'Uncategorized'."
+)
+
+
+@lru_cache(maxsize=8)
+def _prepare_categories(categories: tuple[str, ...]) -> tuple[str, frozenset[str], str]:
+    # Everything that does not depend on the transaction goes into the instructions, with the
+    # categories in canonical order, so consecutive calls share a byte-identical prefix that the
+    # provider can serve from its prompt cache. The key routes those calls to the same cache.
+    # Keyed on the caller's order: a repeated list is a cache hit without re-sorting it per call.
+    instructions = INSTRUCTIONS
+    if categories:
+        instructions += f"\nUse ONLY one of the following categories: {', '.join(sorted(categories))}"
+    cache_key = hashlib.sha1(instructions.encode()).hexdigest()[:32]
+    return instructions, frozenset(categories), cache_key
+
+
 class LLMClassifier(Classifier):
-    def __init__(self, api_key: str | None = None, model: str = "gpt-3.5-turbo", base_url: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = "gpt-3.5-turbo",
+        base_url: str | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        semantic_cache_threshold: float = 0.0,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+        semantic_cache_path: str | None = None,
+    ):
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        # prompt_cache_key is OpenAI-specific; compatible servers may reject unknown fields
+        self._send_prompt_cache_key = base_url is None or httpx.URL(base_url).host == OPENAI_API_HOST
+        # Keep connections warm between calls and multiplex concurrent requests over HTTP/2
+        # instead of paying a TLS handshake whenever the default pool runs dry.
+        limits = httpx.Limits(
+            max_connections=max_workers,
+            max_keepalive_connections=max_workers,
+            keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+        )
         self.client = OpenAI(
-            api_key=api_key or os.getenv("OPENAI_API_KEY"),
-            base_url=base_url or os.getenv("OPENAI_BASE_URL") or None
+            api_key=api_key,
+            base_url=base_url,
+            http_client=httpx.Client(limits=limits, http2=True),
+        )
+        # Async twin for bulk work: many requests in flight over one pooled connection set
+        self.aclient = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=httpx.AsyncClient(limits=limits, http2=True),
         )
         self.model = model
+        self._semaphore = asyncio.Semaphore(max(1, max_workers))
+        # Proactive pacing against the account limits; 0 leaves that dimension unlimited.
+        self._rpm_bucket = TokenBucket.per_minute(requests_per_minute) if requests_per_minute > 0 else None
+        self._tpm_bucket = TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute > 0 else None
+        # temperature=0 makes identical requests deterministic, so answers can be reused verbatim
+        self._cache = ResponseCache(max_size=cache_size)
+        # Near-duplicate descriptions ("STARBUCKS #123" vs "#456") reuse an earlier answer
+        # when their embeddings are at least this similar; 0 disables the lookup.
+        self.embedding_model = embedding_model
+        self._semantic_cache = (
+            SemanticCache(threshold=semantic_cache_threshold, max_size=cache_size)
+            if semantic_cache_threshold > 0
+            else None
+        )
+        # Persisted across restarts so known descriptions are not embedded again
+        self.semantic_cache_path = semantic_cache_path
+        if self._semantic_cache is not None and semantic_cache_path:
+            try:
+                if self._semantic_cache.load(semantic_cache_path, tag=embedding_model):
+                    logger.info("Loaded %d semantic cache entries", len(self._semantic_cache))
+            except Exception as e:
+                logger.warning(f"Could not load semantic cache, starting empty: {e}")
 
     def classify(
         self, transaction: Transaction, valid_categories: list[str] | None = None
     ) -> CategorizationResult | None:
         try:
-            prompt_categories = ""
-            if valid_categories:
-                cats_str = ", ".join(valid_categories)
-                prompt_categories = f"\nUse ONLY one of the following categories: {cats_str}"
-
-            prompt = f"""
-            Categorize this financial transaction into a standard personal finance category.
-            Transaction: {transaction.description}
-            Amount: {transaction.amount} {transaction.currency}
-            Date: {transaction.date}
-            {prompt_categories}
-
-            Return ONLY the category name. If unsure or if it doesn't fit any valid category, return 'Uncategorized'.
-            """
-
-            response = self.client.responses.create(
-                model=self.model,
-                instructions="You are a helpful financial assistant.",
-                input=prompt,
-                temperature=0.0
-            )
+            params, allowed_categories = self._request_params(transaction, valid_categories)
+            cache_key = self._cache_key(params)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return self._build_result(cached, allowed_categories, source="llm_cache")
+            embedding = self._embed(transaction.description) if self._semantic_cache is not None else None
+            similar = self._lookup_similar(embedding, allowed_categories)
+            if similar:
+                return similar
+            response = self._create_response(params)
+            answer = self._extract_output_text(response)
+            self._remember(cache_key, embedding, answer)
+            return self._build_result(answer, allowed_categories)
+        except Exception as e:
+            logger.error(f"LLM Error: {e}")
+            return None
 
-            category_name = self._extract_output_text(response)
-            if category_name is None:
-                return None
-            category_name = category_name.strip()
+    async def aclassify(
+        self, transaction: Transaction, valid_categories: list[str] | None = None
+    ) -> CategorizationResult | None:
+        try:
+            params, allowed_categories = self._request_params(transaction, valid_categories)
+            cache_key = self._cache_key(params)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return self._build_result(cached, allowed_categories, source="llm_cache")
+            async with self._semaphore:
+                embedding = await self._aembed(transaction.description) if self._semantic_cache is not None else None
+                similar = self._lookup_similar(embedding, allowed_categories)
+                if similar:
+                    return similar
+                response = await self._acreate_response(params)
+            answer = self._extract_output_text(response)
+            self._remember(cache_key, embedding, answer)
+            return self._build_result(answer, allowed_categories)
+        except Exception as e:
+            logger.error(f"LLM Error: {e}")
+            return None
+
+    def _create_response(self, params: dict[str, Any]) -> Response:
+        tokens = self._estimate_tokens(params)
+        sdk_params = self._sdk_params(params)
+        for attempt in range(RATE_LIMIT_RETRIES):
+            self._acquire(tokens)
+            try:
+                response = self.client.responses.create(**sdk_params)
+            except RateLimitError:
+                time.sleep(self._on_rate_limited(attempt))
+                continue
+            self._on_success()
+            return response
+        # Out of retries: a rate limit on this last attempt reaches the caller
+        self._acquire(tokens)
+        response = self.client.responses.create(**sdk_params)
+        self._on_success()
+        return response
+
+    async def _acreate_response(self, params: dict[str, Any]) -> Response:
+        tokens = self._estimate_tokens(params)
+        sdk_params = self._sdk_params(params)
+        for attempt in range(RATE_LIMIT_RETRIES):
+            await self._aacquire(tokens)
+            try:
+                response = await self.aclient.responses.create(**sdk_params)
+            except RateLimitError:
+                await asyncio.sleep(self._on_rate_limited(attempt))
+                continue
+            self._on_success()
+            return response
+        await self._aacquire(tokens)
+        response = await self.aclient.responses.create(**sdk_params)
+        self._on_success()
+        return response
+
+    def _acquire(self, tokens: int) -> None:
+        if self._rpm_bucket:
+            self._rpm_bucket.acquire(1)
+        if self._tpm_bucket:
+            self._tpm_bucket.acquire(tokens)
+
+    async def _aacquire(self, tokens: int) -> None:
+        if self._rpm_bucket:
+            await self._rpm_bucket.aacquire(1)
+        if self._tpm_bucket:
+            await self._tpm_bucket.aacquire(tokens)
+
+    @staticmethod
+    def _estimate_tokens(params: dict[str, Any]) -> int:
+        # ~4 characters per token is close enough for pacing purposes
+        prompt_chars = len(params["input"]) + len(params["instructions"])
+        return prompt_chars // 4 + COMPLETION_TOKEN_ESTIMATE
+
+    def _on_rate_limited(self, attempt: int) -> float:
+        for bucket in (self._rpm_bucket, self._tpm_bucket):
+            if bucket:
+                bucket.throttle()
+        delay = RATE_LIMIT_BACKOFF_SECONDS * (2 ** attempt)
+        delay += random.uniform(0, delay)
+        logger.warning("LLM rate limited; retrying in %.2fs (attempt %d)", delay, attempt + 1)
+        return delay
+
+    def _on_success(self) -> None:
+        for bucket in (self._rpm_bucket, self._tpm_bucket):
+            if bucket:
+                bucket.recover()
+
+    async def aclassify_many(
+        self, transactions: list[Transaction], valid_categories: list[str] | None = None
+    ) -> list[CategorizationResult | None]:
+        """Classify transactions concurrently, at most max_workers requests in flight."""
+        results = await asyncio.gather(
+            *(self.aclassify(transaction, valid_categories) for transaction in transactions),
+            return_exceptions=True,
+        )
+        return [None if isinstance(result, BaseException) else result for result in results]
+
+    def save_semantic_cache(self) -> None:
+        if self._semantic_cache is None or not self.semantic_cache_path:
+            return
+        try:
+            self._semantic_cache.save(self.semantic_cache_path, tag=self.embedding_model)
+        except Exception as e:
+            logger.warning(f"Could not save semantic cache: {e}")
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.save_semantic_cache)
+        self.client.close()
+        await self.aclient.close()
+
+    def classify_many(
+        self,
+        transactions: list[Transaction],
+        valid_categories: list[str] | None = None,
+        *,
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        timeout: float | None = None,
+    ) -> list[CategorizationResult | None]:
+        """
+        Classify many transactions through the OpenAI Batch API.
+
+        Blocks until the batch finishes; results keep the input order and are
+        None where the model gave no valid category or the batch failed.
+        """
+        results: list[CategorizationResult | None] = [None] * len(transactions)
+        if not transactions:
+            return results
+
+        allowed_categories: frozenset[str] | None = None
+        pending: dict[int, tuple[dict[str, Any], str]] = {}
+        for index, transaction in enumerate(transactions):
+            params, allowed_categories = self._request_params(transaction, valid_categories)
+            cache_key = self._cache_key(params)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                results[index] = self._build_result(cached, allowed_categories, source="llm_cache")
+                continue
+            pending[index] = (params, cache_key)
+
+        embeddings: dict[int, list[float]] = {}
+        if self._semantic_cache is not None and pending:
+            vectors = self._embed_many([transactions[index].description for index in pending])
+            if vectors and len(vectors) == len(pending):
+                embeddings = dict(zip(pending, vectors, strict=True))
 
-            if valid_categories:
-                if category_name not in valid_categories:
-                    return None
+        cache_keys: dict[int, str] = {}
+        lines: list[bytes] = []
+        for index, (params, cache_key) in pending.items():
+            similar = self._lookup_similar(embeddings.get(index), allowed_categories)
+            if similar:
+                results[index] = similar
+                continue
+            cache_keys[index] = cache_key
+            lines.append(orjson.dumps({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": params,
+            }))
 
-            # Simple heuristic for confidence (LLMs are usually confident)
-            return CategorizationResult(
-                category=Category(name=category_name),
-                confidence=0.9, # Arbitrary fallback confidence
-                source="llm"
+        if not lines:
+            return results
+
+        try:
+            input_file = self.client.files.create(
+                file=("categorize.jsonl", b"\n".join(lines)),
+                purpose="batch",
             )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h",
+            )
+            batch = self._wait_for_batch(
+                batch,
+                poll_interval=poll_interval,
+                max_poll_interval=max_poll_interval,
+                timeout=timeout,
+            )
+            if batch.status != "completed" or not batch.output_file_id:
+                logger.error("LLM batch %s ended with status %s", batch.id, batch.status)
+                return results
+            output = self.client.files.content(batch.output_file_id).text
         except Exception as e:
-            logger.error(f"LLM Error: {e}")
+            logger.error(f"LLM batch error: {e}")
+            return results
+
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+                index = int(record["custom_id"])
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    logger.warning("LLM batch item %s failed: %s", index, record.get("error"))
+                    continue
+                body = Response.model_validate(response["body"])
+                answer = self._extract_output_text(body)
+                self._remember(cache_keys[index], embeddings.get(index), answer)
+                results[index] = self._build_result(answer, allowed_categories)
+            except Exception as e:
+                logger.error(f"LLM batch result error: {e}")
+
+        return results
+
+    def _wait_for_batch(
+        self,
+        batch: Batch,
+        *,
+        poll_interval: float,
+        max_poll_interval: float,
+        timeout: float | None,
+    ) -> Batch:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = poll_interval
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise TimeoutError(f"LLM batch {batch.id} still {batch.status} after {timeout}s")
+            time.sleep(delay)
+            delay = min(delay * 2, max_poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+        return batch
+
+    def _request_params(
+        self, transaction: Transaction, valid_categories: list[str] | None
+    ) -> tuple[dict[str, Any], frozenset[str] | None]:
+        instructions, categories, prompt_cache_key = _prepare_categories(tuple(valid_categories or ()))
+        allowed_categories = categories if valid_categories else None
+        prompt = (
+            f"Transaction: {transaction.description}\n"
+            f"Amount: {transaction.amount} {transaction.currency}\n"
+            f"Date: {transaction.date}"
+        )
+
+        params: dict[str, Any] = {
+            "model": self.model,
+            "instructions": instructions,
+            "input": prompt,
+            "temperature": 0.0,
+        }
+        if self._send_prompt_cache_key:
+            params["prompt_cache_key"] = prompt_cache_key
+        return params, allowed_categories
+
+    @staticmethod
+    def _sdk_params(params: dict[str, Any]) -> dict[str, Any]:
+        sdk_params = dict(params)
+        prompt_cache_key = sdk_params.pop("prompt_cache_key", None)
+        if prompt_cache_key is not None:
+            # Sent through extra_body so older SDK releases without the keyword still accept it
+            sdk_params["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+        return sdk_params
+
+    def _embed(self, text: str) -> list[float] | None:
+        vectors = self._embed_many([text])
+        return vectors[0] if vectors else None
+
+    def _embed_many(self, texts: list[str]) -> list[list[float]] | None:
+        try:
+            response = self.client.embeddings.create(model=self.embedding_model, input=texts)
+        except Exception as e:
+            logger.warning(f"LLM embedding error, skipping semantic cache: {e}")
+            return None
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def _aembed(self, text: str) -> list[float] | None:
+        try:
+            response = await self.aclient.embeddings.create(model=self.embedding_model, input=[text])
+        except Exception as e:
+            logger.warning(f"LLM embedding error, skipping semantic cache: {e}")
             return None
+        return response.data[0].embedding
+
+    def _lookup_similar(
+        self, embedding: list[float] | None, allowed_categories: frozenset[str] | None
+    ) -> CategorizationResult | None:
+        if embedding is None or self._semantic_cache is None:
+            return None
+        answer = self._semantic_cache.lookup(embedding)
+        return self._build_result(answer, allowed_categories, source="llm_semcache")
+
+    def _remember(self, cache_key: str, embedding: list[float] | None, answer: str | None) -> None:
+        if answer is None:
+            return
+        self._cache.put(cache_key, answer)
+        if embedding is not None and self._semantic_cache is not None:
+            self._semantic_cache.add(embedding, answer)
+
+    @staticmethod
+    def _cache_key(params: dict[str, Any]) -> str:
+        return ResponseCache.key(params["model"], params["instructions"], params["input"])
+
+    @staticmethod
+    def _build_result(
+        category_name: str | None,
+        allowed_categories: frozenset[str] | None,
+        source: str = "llm",
+    ) -> CategorizationResult | None:
+        if category_name is None:
+            return None
+        category_name = category_name.strip()
+
+        if allowed_categories is not None:
+            if category_name not in allowed_categories:
+                return None
+
+        # Simple heuristic for confidence (LLMs are usually confident)
+        return CategorizationResult(
+            category=category_named(category_name),
+            confidence=0.9, # Arbitrary fallback confidence
+            source=source
+        )
 
     @staticmethod
     def _extract_output_text(response: object) -> str | None:
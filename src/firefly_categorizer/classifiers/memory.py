@@ -1,31 +1,112 @@
-import json
 import os
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from collections.abc import Collection, Sequence
 
+import numpy as np
+import orjson
 from rapidfuzz import fuzz, process
 
-from firefly_categorizer.models import CategorizationResult, Category, Transaction
+from firefly_categorizer.logger import get_logger
+from firefly_categorizer.models import CategorizationResult, Category, Transaction, category_named
 
 from .base import Classifier
 
+logger = get_logger(__name__)
+
+LEGACY_JSON_NAME = "memory.json"
+# Fuzzy matching only scores the descriptions sharing the most trigrams with the query.
+MAX_FUZZY_CANDIDATES = 50
+MIN_SHARED_TRIGRAMS = 2
+# Below this many candidates, spreading the scoring over threads costs more than it saves.
+PARALLEL_SCORING_MIN = 1000
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    # Bank feeds vary case and spacing ("Amazon.com" vs "AMAZON.COM  ") for the same payee
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def _token_sort(text: str) -> str:
+    # fuzz.ratio over token-sorted strings is exactly fuzz.token_sort_ratio
+    return " ".join(sorted(text.split()))
+
 
 class MemoryMatcher(Classifier):
-    def __init__(self, data_path: str = "memory.json", threshold: float = 90.0):
+    def __init__(self, data_path: str = "memory.sqlite", threshold: float = 90.0):
         self.data_path = data_path
         self.threshold = threshold
         self.memory: dict[str, str] = {} # description -> category_name
+        self._normalized: dict[str, str] = {} # normalized description -> category_name
+        self._trigram_index: defaultdict[str, set[str]] = defaultdict(set)
+        self._sorted_tokens: dict[str, str] = {}
+        # Each learn is a single-row upsert instead of rewriting the whole file
+        self._conn = sqlite3.connect(data_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory (description TEXT PRIMARY KEY, category TEXT NOT NULL)"
+        )
+        self._import_legacy_json()
         self.load()
 
+    def _import_legacy_json(self) -> None:
+        # One-off migration of the memory.json written by earlier versions
+        legacy_path = os.path.join(os.path.dirname(self.data_path), LEGACY_JSON_NAME)
+        if not os.path.exists(legacy_path):
+            return
+        if self._conn.execute("SELECT 1 FROM memory LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_path, "rb") as f:
+                legacy = orjson.loads(f.read())
+        except orjson.JSONDecodeError:
+            logger.warning(f"Ignoring unreadable legacy memory file {legacy_path}")
+            return
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO memory VALUES (?, ?)", legacy.items())
+        logger.info(f"Imported {len(legacy)} memory entries from {legacy_path}")
+
     def load(self) -> None:
-        if os.path.exists(self.data_path):
-            try:
-                with open(self.data_path) as f:
-                    self.memory = json.load(f)
-            except json.JSONDecodeError:
-                self.memory = {}
+        self.memory = dict(self._conn.execute("SELECT description, category FROM memory"))
+        self._normalized = {}
+        self._trigram_index = defaultdict(set)
+        self._sorted_tokens = {}
+        for description, category_name in self.memory.items():
+            self._index(description, category_name)
+
+    def _index(self, description: str, category_name: str) -> None:
+        self._normalized[_normalize(description)] = category_name
+        self._sorted_tokens[description] = _token_sort(description)
+        for trigram in _trigrams(description):
+            self._trigram_index[trigram].add(description)
+
+    def _fuzzy_candidates(self, description: str) -> tuple[Sequence[str], Collection[str]]:
+        """Candidate descriptions and their token-sorted forms, in matching order."""
+        query_trigrams = _trigrams(description)
+        if len(self.memory) <= MAX_FUZZY_CANDIDATES or not query_trigrams:
+            # Full scan straight over the cached sorted forms; dict order keeps both views aligned
+            return list(self._sorted_tokens), self._sorted_tokens.values()
+        overlap: Counter[str] = Counter()
+        for trigram in query_trigrams:
+            overlap.update(self._trigram_index.get(trigram, ()))
+        min_shared = min(MIN_SHARED_TRIGRAMS, len(query_trigrams))
+        candidates = [
+            candidate for candidate, shared in overlap.most_common(MAX_FUZZY_CANDIDATES)
+            if shared >= min_shared
+        ]
+        return candidates, [self._sorted_tokens[candidate] for candidate in candidates]
 
-    def save(self) -> None:
-        with open(self.data_path, "w") as f:
-            json.dump(self.memory, f, indent=2)
+    def close(self) -> None:
+        self._conn.close()
 
     def classify(
         self, transaction: Transaction, valid_categories: list[str] | None = None
@@ -39,31 +120,37 @@ class MemoryMatcher(Classifier):
                 return True
             return cat_name in valid_categories
 
-        # 1. Exact match
-        if transaction.description in self.memory:
-            category_name = self.memory[transaction.description]
+        # 1. Exact match, ignoring case and whitespace differences
+        category_name = self.memory.get(transaction.description) or self._normalized.get(
+            _normalize(transaction.description)
+        )
+        if category_name is not None:
             if is_valid(category_name):
                 return CategorizationResult(
-                    category=Category(name=category_name),
+                    category=category_named(category_name),
                     confidence=1.0,
                     source="memory_exact"
                 )
 
         # 2. Fuzzy match
-        # Extract best match from memory keys
-        result = process.extractOne(
-            transaction.description,
-            self.memory.keys(),
-            scorer=fuzz.token_sort_ratio
-        )
-
-        if result:
-            match_description, score, _ = result
+        # Score the memory keys that share enough trigrams with the query in one native call,
+        # against token-sorted forms precomputed at learn time
+        candidates, sorted_candidates = self._fuzzy_candidates(transaction.description)
+        if candidates:
+            scores = process.cdist(
+                [_token_sort(transaction.description)],
+                sorted_candidates,
+                scorer=fuzz.ratio,
+                score_cutoff=self.threshold,
+                workers=-1 if len(candidates) > PARALLEL_SCORING_MIN else 1,
+            )[0]
+            best = int(np.argmax(scores))
+            score = float(scores[best])
             if score >= self.threshold:
-                category_name = self.memory[match_description]
+                category_name = self.memory[candidates[best]]
                 if is_valid(category_name):
                     return CategorizationResult(
-                        category=Category(name=category_name),
+                        category=category_named(category_name),
                         confidence=score / 100.0,
                         source="memory_fuzzy"
                     )
@@ -71,9 +158,15 @@ class MemoryMatcher(Classifier):
         return None
 
     def learn(self, transaction: Transaction, category: Category) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO memory VALUES (?, ?)", (transaction.description, category.name)
+        )
         self.memory[transaction.description] = category.name
-        self.save()
+        self._index(transaction.description, category.name)
 
     def clear(self) -> None:
+        self._conn.execute("DELETE FROM memory")
         self.memory = {}
-        self.save()
+        self._normalized = {}
+        self._trigram_index = defaultdict(set)
+        self._sorted_tokens = {}
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+# Adaptive refill never drops below this fraction of the configured rate.
+MIN_REFILL_FRACTION = 0.1
+
+
+class TokenBucket:
+    """
+    Token bucket shared by threads and coroutines.
+
+    Callers reserve tokens up front and then sleep off any deficit, so concurrent
+    callers queue behind each other instead of all firing at once.
+    """
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.base_refill_per_sec = refill_per_sec
+        self.refill_per_sec = refill_per_sec
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "TokenBucket":
+        return cls(capacity=limit, refill_per_sec=limit / 60.0)
+
+    def _reserve(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_sec)
+            self._updated_at = now
+            self._tokens -= min(amount, self.capacity)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_sec
+
+    def acquire(self, amount: float = 1.0) -> None:
+        delay = self._reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, amount: float = 1.0) -> None:
+        delay = self._reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def throttle(self, factor: float = 0.8) -> None:
+        """Slow the refill after the provider pushed back."""
+        with self._lock:
+            floor = self.base_refill_per_sec * MIN_REFILL_FRACTION
+            self.refill_per_sec = max(floor, self.refill_per_sec * factor)
+
+    def recover(self, factor: float = 1.05) -> None:
+        """Creep back towards the configured rate after successful calls."""
+        if self.refill_per_sec >= self.base_refill_per_sec:
+            return
+        with self._lock:
+            self.refill_per_sec = min(self.base_refill_per_sec, self.refill_per_sec * factor)
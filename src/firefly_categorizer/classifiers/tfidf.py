@@ -1,92 +1,257 @@
 import os
 import pickle
+import threading
+import zipfile
+from typing import Any
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+import numpy as np
+import orjson
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.linear_model import SGDClassifier
-from sklearn.pipeline import Pipeline
 
-from firefly_categorizer.models import CategorizationResult, Category, Transaction
+from firefly_categorizer.logger import get_logger
+from firefly_categorizer.models import CategorizationResult, Category, Transaction, category_named
 
 from .base import Classifier
 
+logger = get_logger(__name__)
+
+# Fixed size of the hashed char-ngram space; keeps the weights at a few MB per category.
+HASH_FEATURES = 2 ** 16
+# Persist after this many learned examples, or this long after the first unsaved one.
+SAVE_EVERY = 16
+SAVE_INTERVAL_SECONDS = 30.0
+
 
 class TfidfClassifier(Classifier):
-    def __init__(self, data_path: str = "tfidf_model.pkl", threshold: float = 0.5):
+    def __init__(self, data_path: str = "tfidf_model.npz", threshold: float = 0.5):
+        # Weights go to data_path as plain numpy arrays; the training examples to a JSON sidecar
         self.data_path = data_path
+        base_path = os.path.splitext(data_path)[0]
+        self.examples_path = f"{base_path}.json"
+        self.legacy_path = f"{base_path}.pkl"
         self.threshold = threshold
-        self.pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 5), min_df=1)),
-            ('clf', SGDClassifier(loss='log_loss', random_state=42))
-        ])
+        # Stateless vectorizer: the feature space never changes, so new examples can be
+        # learned incrementally instead of rebuilding a vocabulary over the whole history.
+        self.vectorizer = HashingVectorizer(
+            n_features=HASH_FEATURES, analyzer='char_wb', ngram_range=(3, 5), alternate_sign=False
+        )
+        self.clf = SGDClassifier(loss='log_loss', random_state=42)
         self.examples: list[str] = []
         self.labels: list[str] = []
         self.is_fitted = False
+        # Saving happens off the learn path: learn marks the model dirty and a background
+        # timer writes it out; _save_lock keeps overlapping writes in order.
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = 0
+        self._save_timer: threading.Timer | None = None
+        self._reset_weights()
         self.load()
 
+    def _reset_weights(self) -> None:
+        self._coef: np.ndarray | None = None
+        self._intercept: np.ndarray | None = None
+        self._classes: np.ndarray | None = None
+
+    def _cache_weights(self) -> None:
+        # Transposed, contiguous copy so scoring is a plain sparse @ dense product
+        self._coef = self.clf.coef_.T.copy()
+        self._intercept = self.clf.intercept_.copy()
+        self._classes = self.clf.classes_
+        self.is_fitted = True
+
+    def _fit(self) -> None:
+        self.clf = SGDClassifier(loss='log_loss', random_state=42)
+        self.clf.fit(self.vectorizer.transform(self.examples), self.labels)
+        self._cache_weights()
+
+    def _partial_fit(self, description: str, label: str) -> None:
+        self.clf.partial_fit(self.vectorizer.transform([description]), [label])
+        self._cache_weights()
+
+    def _predict_proba(self, descriptions: list[str]) -> np.ndarray:
+        # Same maths as SGDClassifier.predict_proba for log_loss: per-class sigmoid of the
+        # decision function, normalised across classes (or [1 - p, p] for two classes).
+        assert self._coef is not None
+        scores = np.asarray(self.vectorizer.transform(descriptions) @ self._coef) + self._intercept
+        probs = 1.0 / (1.0 + np.exp(-scores))
+        if probs.shape[1] == 1:
+            return np.hstack([1.0 - probs, probs])
+        sums = probs.sum(axis=1, keepdims=True)
+        sums[sums == 0] = 1.0
+        return probs / sums
+
     def load(self) -> None:
-        if os.path.exists(self.data_path):
-            try:
-                with open(self.data_path, "rb") as f:
-                    data = pickle.load(f)
-                    self.examples = data.get("examples", [])
-                    self.labels = data.get("labels", [])
-                    if self.examples:
-                        self.pipeline.fit(self.examples, self.labels)
-                        self.is_fitted = True
-            except (pickle.UnpicklingError, EOFError):
-                self.examples = []
-                self.labels = []
-                self.is_fitted = False
+        try:
+            if os.path.exists(self.examples_path):
+                with open(self.examples_path, "rb") as f:
+                    data = orjson.loads(f.read())
+                self.examples = data.get("examples", [])
+                self.labels = data.get("labels", [])
+                if os.path.exists(self.data_path) and self._try_restore_weights():
+                    return
+            elif os.path.exists(self.legacy_path):
+                self._load_legacy()
+            if not self.is_fitted and len(set(self.labels)) >= 2:
+                self._fit()
+        except (orjson.JSONDecodeError, pickle.UnpicklingError, EOFError, OSError, ValueError, KeyError):
+            self.examples = []
+            self.labels = []
+            self.is_fitted = False
+            self._reset_weights()
+
+    def _load_legacy(self) -> None:
+        # One-off migration of tfidf.pkl from earlier versions; the next save writes the new format
+        with open(self.legacy_path, "rb") as f:
+            data = pickle.load(f)
+        self.examples = data.get("examples", [])
+        self.labels = data.get("labels", [])
+        model = data.get("model")
+        if isinstance(model, SGDClassifier) and hasattr(model, "coef_"):
+            model.densify()
+            if model.coef_.shape[1] == HASH_FEATURES:
+                self.clf = model
+                self._cache_weights()
+
+    def _try_restore_weights(self) -> bool:
+        # Unreadable weights only cost a refit; the examples already loaded are kept
+        try:
+            return self._restore_weights()
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logger.warning(f"Could not restore TF-IDF weights, refitting: {e}")
+            return False
+
+    def _restore_weights(self) -> bool:
+        # Rebuild the fitted SGDClassifier from its arrays instead of refitting the whole
+        # history on startup; weights for another feature size fall back to a refit.
+        with np.load(self.data_path, allow_pickle=False) as weights:
+            n_classes, n_features = (int(n) for n in weights["coef_shape"])
+            if n_features != HASH_FEATURES:
+                return False
+            coef = np.zeros(n_classes * n_features, dtype=np.float64)
+            coef[weights["coef_index"]] = weights["coef_values"]
+            clf = SGDClassifier(loss='log_loss', random_state=42)
+            clf.coef_ = coef.reshape(n_classes, n_features)
+            clf.intercept_ = weights["intercept"]
+            clf.classes_ = weights["classes"]
+            clf.t_ = float(weights["t"])
+            clf.n_iter_ = int(weights["n_iter"])
+            clf.n_features_in_ = n_features
+        self.clf = clf
+        self._cache_weights()
+        return True
 
     def save(self) -> None:
-        with open(self.data_path, "wb") as f:
-            pickle.dump({
-                "examples": self.examples,
-                "labels": self.labels
-            }, f)
+        """Write the current examples and model to disk now."""
+        with self._lock:
+            self._dirty += 1
+        self.flush()
+
+    def flush(self) -> None:
+        """Write pending changes, if any; call before shutdown."""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                weights, examples = self._snapshot()
+                self._dirty = 0
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+            if weights is None:
+                if os.path.exists(self.data_path):
+                    os.remove(self.data_path)
+            else:
+                tmp_weights = f"{self.data_path}.tmp.npz"
+                np.savez(tmp_weights, **weights)
+                os.replace(tmp_weights, self.data_path)
+            tmp_examples = f"{self.examples_path}.tmp"
+            with open(tmp_examples, "wb") as f:
+                f.write(orjson.dumps(examples))
+            os.replace(tmp_examples, self.examples_path)
+
+    def _snapshot(self) -> tuple[dict[str, np.ndarray] | None, dict[str, Any]]:
+        examples = {"examples": list(self.examples), "labels": list(self.labels)}
+        if not self.is_fitted:
+            return None, examples
+        # Only the n-grams seen in training have weights, so store the non-zero entries
+        coef = self.clf.coef_.ravel()
+        index = np.flatnonzero(coef)
+        weights = {
+            "coef_shape": np.array(self.clf.coef_.shape),
+            "coef_index": index,
+            "coef_values": coef[index],
+            "intercept": self.clf.intercept_.copy(),
+            "classes": np.asarray(self.clf.classes_, dtype=str),
+            "t": np.array(self.clf.t_),
+            "n_iter": np.array(self.clf.n_iter_),
+        }
+        return weights, examples
+
+    def _schedule_save(self) -> None:
+        # Caller holds self._lock
+        self._dirty += 1
+        if self._dirty >= SAVE_EVERY:
+            delay = 0.0
+        elif self._save_timer is None:
+            delay = SAVE_INTERVAL_SECONDS
+        else:
+            return
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
 
     def classify(
         self, transaction: Transaction, valid_categories: list[str] | None = None
     ) -> CategorizationResult | None:
-        if not self.is_fitted:
-            return None
+        return self.classify_many([transaction], valid_categories)[0]
+
+    def classify_many(
+        self, transactions: list[Transaction], valid_categories: list[str] | None = None
+    ) -> list[CategorizationResult | None]:
+        """Score all transactions with a single vectorizer pass and matrix product."""
+        if not self.is_fitted or not transactions:
+            return [None] * len(transactions)
 
         try:
-            probs = self.pipeline.predict_proba([transaction.description])[0]
-            max_prob_idx = probs.argmax()
-            confidence = probs[max_prob_idx]
-            category_name = self.pipeline.classes_[max_prob_idx]
-
-            if confidence >= self.threshold:
-                if valid_categories is None or category_name in valid_categories:
-                    return CategorizationResult(
-                        category=Category(name=category_name),
-                        confidence=float(confidence),
-                        source="tfidf"
-                    )
+            probs = self._predict_proba([t.description for t in transactions])
         except Exception:
             # Handle cases where vocabulary might not match, though Tfidf handles this gracefully mainly
-            pass
+            return [None] * len(transactions)
 
-        return None
+        assert self._classes is not None
+        best = probs.argmax(axis=1)
+        confidences = probs[np.arange(len(transactions)), best]
+        names = self._classes[best]
+        allowed = None if valid_categories is None else set(valid_categories)
+        return [
+            CategorizationResult(category=category_named(str(name)), confidence=float(confidence), source="tfidf")
+            if confidence >= self.threshold and (allowed is None or name in allowed)
+            else None
+            for name, confidence in zip(names, confidences, strict=True)
+        ]
 
     def learn(self, transaction: Transaction, category: Category) -> None:
-        self.examples.append(transaction.description)
-        self.labels.append(category.name)
+        with self._lock:
+            self.examples.append(transaction.description)
+            self.labels.append(category.name)
 
-        # In a real heavy production system, we wouldn't retrain on every single learn,
-        # but for personal finance volume, this is fine and ensures immediate feedback.
-        if len(set(self.labels)) >= 2:
-            self.pipeline.fit(self.examples, self.labels)
-            self.is_fitted = True
-            self.save()
+            if self.is_fitted and self._classes is not None and category.name in self._classes:
+                # Known category: a single SGD step on the new example
+                self._partial_fit(transaction.description, category.name)
+            elif len(set(self.labels)) >= 2:
+                # The class set of an SGD model is fixed, so a new category means refitting on the history
+                self._fit()
+            self._schedule_save()
 
     def clear(self) -> None:
-        self.examples = []
-        self.labels = []
-        self.is_fitted = False
-        self.pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 5), min_df=1)),
-            ('clf', SGDClassifier(loss='log_loss', random_state=42))
-        ])
+        with self._lock:
+            self.examples = []
+            self.labels = []
+            self.is_fitted = False
+            self._reset_weights()
+            self.clf = SGDClassifier(loss='log_loss', random_state=42)
         self.save()
@@ -1,5 +1,11 @@
 import os
+import re
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter
+from pathlib import Path
 from typing import Any, Literal
 
 from firefly_categorizer.core import settings
@@ -10,7 +16,7 @@ ValueType = Literal["string", "int", "float"]
 logger = get_logger(__name__)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ConfigField:
     key: str
     label: str
@@ -81,6 +87,40 @@ CONFIG_FIELDS: tuple[ConfigField, ...] = (
         input_type="url",
         category="OpenAI",
     ),
+    ConfigField(
+        key="OPENAI_RPM",
+        label="OpenAI Requests per Minute",
+        description="Pace LLM calls to this request rate. 0 disables pacing.",
+        placeholder="0",
+        input_type="number",
+        category="OpenAI",
+        value_type="int",
+        min_value=0,
+        step=1,
+    ),
+    ConfigField(
+        key="OPENAI_TPM",
+        label="OpenAI Tokens per Minute",
+        description="Pace LLM calls to this estimated token rate. 0 disables pacing.",
+        placeholder="0",
+        input_type="number",
+        category="OpenAI",
+        value_type="int",
+        min_value=0,
+        step=1,
+    ),
+    ConfigField(
+        key="OPENAI_SEMANTIC_CACHE",
+        label="Semantic Cache Similarity",
+        description="Reuse an earlier LLM answer for descriptions at least this similar (0-1). 0 disables.",
+        placeholder="0.92",
+        input_type="number",
+        category="OpenAI",
+        value_type="float",
+        min_value=0.0,
+        max_value=1.0,
+        step=0.01,
+    ),
     ConfigField(
         key="AUTO_APPROVE_THRESHOLD",
         label="Auto-approve Threshold",
@@ -150,6 +190,8 @@ CONFIG_FIELDS: tuple[ConfigField, ...] = (
     ),
 )
 
+CONFIG_FIELDS_BY_KEY: dict[str, ConfigField] = {field.key: field for field in CONFIG_FIELDS}
+
 CONFIG_TEMPLATE = """# Firefly Categorizer configuration
 # These settings only take effect when the same environment variable is not set.
 # Remove the leading "#" to enable a setting here.
@@ -172,6 +214,13 @@ CONFIG_TEMPLATE = """# Firefly Categorizer configuration
 # OpenAI Base URL (Optional, for OpenAI-compatible APIs)
 # OPENAI_BASE_URL:
 
+# OpenAI rate limits (requests / tokens per minute, 0 disables pacing)
+# OPENAI_RPM:
+# OPENAI_TPM:
+
+# Reuse LLM answers for similar descriptions (embedding similarity 0-1, 0 disables)
+# OPENAI_SEMANTIC_CACHE:
+
 # Auto-approve threshold (0-1, 0 disables)
 # AUTO_APPROVE_THRESHOLD:
 
@@ -184,7 +233,7 @@ CONFIG_TEMPLATE = """# Firefly Categorizer configuration
 # Tags to apply when auto-approving (comma-separated)
 # AUTO_APPROVE_TAGS:
 
-# Data directory (memory.json, tfidf.pkl)
+# Data directory (memory.sqlite, tfidf.npz, tfidf.json)
 # DATA_DIR:
 
 # Log directory (app.log)
@@ -195,14 +244,17 @@ CONFIG_TEMPLATE = """# Firefly Categorizer configuration
 """
 
 
+@lru_cache(maxsize=1)
 def get_config_keys() -> tuple[str, ...]:
-    return tuple(field.key for field in CONFIG_FIELDS)
+    return tuple(CONFIG_FIELDS_BY_KEY)
 
 
 def get_config_path() -> str | None:
-    config_path = settings.get_config_path()
-    if config_path:
-        return config_path
+    return settings.get_config_path() or _default_config_path()
+
+
+@lru_cache(maxsize=1)
+def _default_config_path() -> str:
     return os.path.join(os.getcwd(), "config", settings.CONFIG_FILENAME)
 
 
@@ -210,15 +262,42 @@ def _load_config_values(config_path: str | None) -> dict[str, str]:
     return settings.read_config_file(config_path)
 
 
-def _group_fields() -> list[tuple[str, list[ConfigField]]]:
-    categories: list[str] = []
-    grouped: dict[str, list[ConfigField]] = {}
-    for field in CONFIG_FIELDS:
-        if field.category not in grouped:
-            grouped[field.category] = []
-            categories.append(field.category)
-        grouped[field.category].append(field)
-    return [(category, grouped[category]) for category in categories]
+def _build_field_groups() -> tuple[tuple[str, tuple[ConfigField, ...]], ...]:
+    # CONFIG_FIELDS is declared with each category's fields adjacent, so no sort is needed
+    groups = tuple(
+        (category, tuple(fields))
+        for category, fields in groupby(CONFIG_FIELDS, key=attrgetter("category"))
+    )
+    if len({category for category, _ in groups}) != len(groups):
+        raise RuntimeError("CONFIG_FIELDS must list each category's fields together.")
+    return groups
+
+
+# CONFIG_FIELDS is static, so group it once at import; tuples keep callers from mutating it
+_GROUPED_FIELDS = _build_field_groups()
+
+
+def _group_fields() -> tuple[tuple[str, tuple[ConfigField, ...]], ...]:
+    return _GROUPED_FIELDS
+
+
+# The parts of each rendered field that never change; build_config_context only adds the live state
+_FIELD_TEMPLATES: dict[str, dict[str, object]] = {
+    field.key: {
+        "key": field.key,
+        "label": field.label,
+        "description": field.description,
+        "input_type": field.input_type,
+        "options": field.options,
+        "sensitive": field.sensitive,
+        "restart_required": field.restart_required,
+        "step": field.step,
+    }
+    for field in CONFIG_FIELDS
+}
+_OPTION_SETS: dict[str, frozenset[str]] = {
+    field.key: frozenset(field.options) for field in CONFIG_FIELDS if field.options
+}
 
 
 def build_config_context(
@@ -228,20 +307,23 @@ def build_config_context(
     config_path = get_config_path()
     config_values = _load_config_values(config_path)
     sections: list[dict[str, object]] = []
-    env_override_count = 0
+    # One pass over the environment for the whole page instead of a lookup per field
+    overrides = settings.env_overrides(get_config_keys())
+    env_override_count = len(overrides)
+    errors = field_errors or {}
 
     for category, fields in _group_fields():
         section_fields: list[dict[str, object]] = []
         for field in fields:
-            env_override = settings.is_env_override(field.key)
-            if env_override:
-                env_override_count += 1
+            env_override = field.key in overrides
             raw_value = config_values.get(field.key, "")
             display_value = raw_value
             if env_override:
-                env_value = os.getenv(field.key, "")
+                env_value = overrides[field.key]
                 if field.options:
-                    display_value = env_value.upper()
+                    # Most overrides are already spelled like the option; only uppercase the rest
+                    options = _OPTION_SETS[field.key]
+                    display_value = env_value if env_value in options else env_value.upper()
                 else:
                     display_value = "" if field.sensitive else env_value
 
@@ -252,19 +334,12 @@ def build_config_context(
             )
             section_fields.append(
                 {
-                    "key": field.key,
-                    "label": field.label,
-                    "description": field.description,
+                    **_FIELD_TEMPLATES[field.key],
                     "placeholder": placeholder,
-                    "input_type": field.input_type,
                     "value": display_value,
-                    "options": field.options,
                     "disabled": env_override,
                     "env_override": env_override,
-                    "sensitive": field.sensitive,
-                    "restart_required": field.restart_required,
-                    "step": field.step,
-                    "error": (field_errors or {}).get(field.key),
+                    "error": errors.get(field.key),
                 }
             )
         sections.append({"name": category, "fields": section_fields})
@@ -276,69 +351,94 @@ def build_config_context(
     }
 
 
+_LINE_BREAK = re.compile(r"[\r\n]")
+
+
 def _validate_value(field: ConfigField, raw_value: str) -> tuple[str, str | None]:
+    # Most fields of a submitted form are left blank
+    if not raw_value:
+        return "", None
     value = raw_value.strip()
     if not value:
         return "", None
 
-    if "\n" in value or "\r" in value:
+    if _LINE_BREAK.search(value):
         return value, "Value must be a single line."
 
+    return _FIELD_VALIDATORS[field.key](value)
+
+
+def _compile_validator(field: ConfigField) -> Callable[[str], tuple[str, str | None]]:
+    """Specialise the type and range checks for one field, so validation does no dispatching."""
     if field.options:
-        normalized = value.upper()
-        if normalized not in field.options:
-            return value, f"Must be one of: {', '.join(field.options)}."
-        return normalized, None
+        options = frozenset(field.options)
+        options_error = f"Must be one of: {', '.join(field.options)}."
 
-    if field.value_type == "int":
-        try:
-            parsed = int(value)
-        except ValueError:
-            return value, "Must be a whole number."
-        if field.min_value is not None and parsed < field.min_value:
-            return value, f"Must be at least {field.min_value}."
-        if field.max_value is not None and parsed > field.max_value:
-            return value, f"Must be at most {field.max_value}."
-        return str(parsed), None
+        def validate_option(value: str) -> tuple[str, str | None]:
+            normalized = value.upper()
+            if normalized not in options:
+                return value, options_error
+            return normalized, None
 
-    if field.value_type == "float":
+        return validate_option
+
+    if field.value_type not in ("int", "float"):
+        return lambda value: (value, None)
+
+    parse: Callable[[str], float] = int if field.value_type == "int" else float
+    type_error = "Must be a whole number." if field.value_type == "int" else "Must be a number."
+    min_value, max_value = field.min_value, field.max_value
+
+    def validate_number(value: str) -> tuple[str, str | None]:
         try:
-            parsed = float(value)
+            parsed = parse(value)
         except ValueError:
-            return value, "Must be a number."
-        if field.min_value is not None and parsed < field.min_value:
-            return value, f"Must be at least {field.min_value}."
-        if field.max_value is not None and parsed > field.max_value:
-            return value, f"Must be at most {field.max_value}."
+            return value, type_error
+        if min_value is not None and parsed < min_value:
+            return value, f"Must be at least {min_value}."
+        if max_value is not None and parsed > max_value:
+            return value, f"Must be at most {max_value}."
         return str(parsed), None
 
-    return value, None
+    return validate_number
+
 
+_FIELD_VALIDATORS = {field.key: _compile_validator(field) for field in CONFIG_FIELDS}
 
-def apply_config_updates(form_values: dict[str, str]) -> tuple[dict[str, str], dict[str, str]]:
+
+def apply_config_updates(form_values: Mapping[str, Any]) -> tuple[dict[str, str], dict[str, str]]:
     errors: dict[str, str] = {}
     updates: dict[str, str] = {}
+    overrides = settings.env_overrides(get_config_keys())
 
-    for field in CONFIG_FIELDS:
-        if settings.is_env_override(field.key):
-            continue
-
-        raw_value = form_values.get(field.key)
-        if raw_value is None:
+    # Walk the submitted values rather than every field; the form usually posts only a few
+    for key, raw_value in form_values.items():
+        field = CONFIG_FIELDS_BY_KEY.get(key)
+        if field is None or raw_value is None or key in overrides:
             continue
 
-        cleaned, error = _validate_value(field, raw_value)
+        cleaned, error = _validate_value(field, str(raw_value))
         if error:
-            errors[field.key] = error
+            errors[key] = error
             continue
-        updates[field.key] = cleaned
+        updates[key] = cleaned
 
     if errors:
         return errors, {}
 
-    _write_config_file(updates)
-    _apply_runtime_overrides(updates)
-    return {}, updates
+    # Re-saving the page unchanged should neither rewrite the file nor rebuild clients
+    current = _load_config_values(get_config_path())
+    file_changes = {key: value for key, value in updates.items() if current.get(key, "") != value}
+    runtime_changes = {key: value for key, value in updates.items() if os.environ.get(key, "") != value}
+    if file_changes:
+        _write_config_file(file_changes)
+    if runtime_changes:
+        _apply_runtime_overrides(runtime_changes)
+    return {}, {**file_changes, **runtime_changes}
+
+
+# "KEY: value" or a commented-out "# KEY:" placeholder; group 1 is the key
+_KEY_LINE = re.compile(r"\s*(?:#\s*)?([^:]*?)\s*:")
 
 
 def _write_config_file(updates: dict[str, str]) -> None:
@@ -346,25 +446,16 @@ def _write_config_file(updates: dict[str, str]) -> None:
     if not config_path:
         raise RuntimeError("No configuration path available.")
 
-    config_dir = os.path.dirname(config_path)
-    if config_dir:
-        os.makedirs(config_dir, exist_ok=True)
-    lines: list[str]
-    if os.path.exists(config_path):
-        with open(config_path, encoding="utf-8") as handle:
-            lines = handle.read().splitlines()
-    else:
-        lines = [str(line) for line in CONFIG_TEMPLATE.splitlines()]
+    path = Path(config_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else CONFIG_TEMPLATE.splitlines()
 
     key_indexes: dict[str, int] = {}
     for index, line in enumerate(lines):
-        stripped = line.strip()
-        if not stripped or ":" not in stripped:
+        match = _KEY_LINE.match(line)
+        if not match:
             continue
-        candidate = stripped
-        if candidate.startswith("#"):
-            candidate = candidate[1:].lstrip()
-        key = candidate.split(":", 1)[0].strip()
+        key = match.group(1)
         if key in updates and key not in key_indexes:
             key_indexes[key] = index
 
@@ -376,8 +467,13 @@ def _write_config_file(updates: dict[str, str]) -> None:
         else:
             lines.append(new_line)
 
-    with open(config_path, "w", encoding="utf-8") as handle:
-        handle.write("\n".join(lines).rstrip("\n") + "\n")
+    # Write next to the target and swap it in, so readers never see a half-written file
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text("\n".join(lines).rstrip("\n") + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+    # Don't rely on the mtime alone: a rewrite within the filesystem's timestamp granularity
+    # could keep it unchanged.
+    settings.invalidate_config_cache(config_path)
 
 
 def _apply_runtime_overrides(updates: dict[str, str]) -> None:
@@ -388,46 +484,61 @@ def _apply_runtime_overrides(updates: dict[str, str]) -> None:
             os.environ[key] = value
         else:
             os.environ.pop(key, None)
+    settings.reload_cached_values()
 
 
-def apply_runtime_updates(app: Any, updates: dict[str, str]) -> None:
-    if not updates:
-        return
-    state = getattr(app, "state", None)
-    if state is None:
+_LLM_CONFIG_KEYS = frozenset({
+    "OPENAI_API_KEY",
+    "OPENAI_MODEL",
+    "OPENAI_BASE_URL",
+    "OPENAI_RPM",
+    "OPENAI_TPM",
+    "OPENAI_SEMANTIC_CACHE",
+})
+
+
+async def apply_runtime_updates(state: Any, updates: dict[str, str]) -> None:
+    if not updates or state is None:
         return
 
-    if {"FIREFLY_URL", "FIREFLY_TOKEN"} & updates.keys():
+    if {"FIREFLY_URL", "FIREFLY_TOKEN", "FIREFLY_CATEGORIES_TTL"} & updates.keys():
         _refresh_firefly(getattr(state, "firefly", None))
 
-    if {"OPENAI_API_KEY", "OPENAI_MODEL", "OPENAI_BASE_URL"} & updates.keys():
-        _refresh_llm(getattr(state, "service", None))
+    if _LLM_CONFIG_KEYS & updates.keys():
+        await _refresh_llm(getattr(state, "service", None))
 
     if "TRAINING_PAGE_SIZE" in updates:
         _refresh_training_page_size(getattr(state, "training_manager", None))
 
 
-def _refresh_firefly(client: Any) -> None:
+@lru_cache(maxsize=1)
+def _runtime_types() -> tuple[type, type, type]:
+    # Imported lazily so core stays importable without the service layer, but only once
     from firefly_categorizer.integration.firefly import FireflyClient
+    from firefly_categorizer.manager import CategorizerService
+    from firefly_categorizer.services.training import TrainingManager
+
+    return FireflyClient, CategorizerService, TrainingManager
+
 
-    if not isinstance(client, FireflyClient):
+def _refresh_firefly(client: Any) -> None:
+    firefly_type, _, _ = _runtime_types()
+    if not isinstance(client, firefly_type):
         return
     client.refresh()
     logger.info("[CONFIG] Firefly client refreshed.")
 
 
-def _refresh_llm(service: Any) -> None:
-    from firefly_categorizer.manager import CategorizerService
-
-    if not isinstance(service, CategorizerService):
+async def _refresh_llm(service: Any) -> None:
+    _, service_type, _ = _runtime_types()
+    if not isinstance(service, service_type):
         return
-    service.refresh_llm()
+    await service.refresh_llm()
 
 
 def _refresh_training_page_size(manager: Any) -> None:
-    from firefly_categorizer.services.training import TrainingManager
-
-    if not isinstance(manager, TrainingManager):
+    _, _, training_type = _runtime_types()
+    if not isinstance(manager, training_type):
         return
     page_size = settings.get_env_int(
         "TRAINING_PAGE_SIZE",
@@ -438,14 +549,15 @@ def _refresh_training_page_size(manager: Any) -> None:
     logger.info("[CONFIG] Training page size set to %s.", page_size)
 
 
+_YAML_SPECIAL_CHARS = frozenset(':#"\'')
+
+
 def _format_yaml_value(value: str) -> str:
     if not value:
         return ""
-    needs_quotes = value[:1].isspace() or value[-1:].isspace()
-    for marker in (":", "#", '"', "'"):
-        if marker in value:
-            needs_quotes = True
-            break
+    needs_quotes = (
+        value[:1].isspace() or value[-1:].isspace() or not _YAML_SPECIAL_CHARS.isdisjoint(value)
+    )
     if not needs_quotes:
         return value
     escaped = value.replace("\\", "\\\\").replace('"', '\\"')
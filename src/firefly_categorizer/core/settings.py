@@ -1,4 +1,6 @@
 import os
+import re
+from collections.abc import Iterable
 
 from dotenv import find_dotenv, load_dotenv
 
@@ -13,6 +15,8 @@ CONFIG_FILENAME = "config.yaml"
 _CONFIG_FILE_PATH: str | None = None
 _CONFIG_FILE_VALUES: dict[str, str] = {}
 _EXTERNAL_ENV_KEYS: set[str] = set()
+# path -> (mtime_ns, size, parsed values); the config page re-reads the file on every request
+_PARSED_CONFIG_CACHE: dict[str, tuple[int, int, dict[str, str]]] = {}
 
 _CONFIG_KEYS = (
     "LOG_LEVEL",
@@ -22,6 +26,9 @@ _CONFIG_KEYS = (
     "OPENAI_API_KEY",
     "OPENAI_MODEL",
     "OPENAI_BASE_URL",
+    "OPENAI_RPM",
+    "OPENAI_TPM",
+    "OPENAI_SEMANTIC_CACHE",
     "AUTO_APPROVE_THRESHOLD",
     "TRAINING_PAGE_SIZE",
     "MANUAL_TAGS",
@@ -52,25 +59,18 @@ def _resolve_config_path() -> str:
     return os.path.join(cwd, CONFIG_FILENAME)
 
 
+# Longest prefix made of plain characters, backslash escapes and complete quoted strings;
+# a "#" right after it starts an inline comment.
+_INLINE_COMMENT_PREFIX = re.compile(r"""(?:[^'"#\\]|\\.|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')*""")
+
+
 def _strip_inline_comment(raw_value: str) -> str:
-    in_single = False
-    in_double = False
-    escaped = False
-    for index, char in enumerate(raw_value):
-        if escaped:
-            escaped = False
-            continue
-        if char == "\\":
-            escaped = True
-            continue
-        if char == '"' and not in_single:
-            in_double = not in_double
-            continue
-        if char == "'" and not in_double:
-            in_single = not in_single
-            continue
-        if char == "#" and not in_single and not in_double:
-            return raw_value[:index].rstrip()
+    if "#" not in raw_value:
+        return raw_value
+    match = _INLINE_COMMENT_PREFIX.match(raw_value)
+    end = match.end() if match else 0
+    if end < len(raw_value) and raw_value[end] == "#":
+        return raw_value[:end].rstrip()
     return raw_value
 
 
@@ -87,9 +87,30 @@ def _unquote_value(raw_value: str) -> str:
 
 
 def read_config_file(path: str | None) -> dict[str, str]:
-    if not path or not os.path.exists(path):
+    if not path:
+        return {}
+    try:
+        stat = os.stat(path)
+    except OSError:
         return {}
 
+    cached = _PARSED_CONFIG_CACHE.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return dict(cached[2])
+
+    values = _parse_config_file(path)
+    _PARSED_CONFIG_CACHE[path] = (stat.st_mtime_ns, stat.st_size, values)
+    return dict(values)
+
+
+def invalidate_config_cache(path: str | None = None) -> None:
+    if path is None:
+        _PARSED_CONFIG_CACHE.clear()
+    else:
+        _PARSED_CONFIG_CACHE.pop(path, None)
+
+
+def _parse_config_file(path: str) -> dict[str, str]:
     values: dict[str, str] = {}
     with open(path, encoding="utf-8") as handle:
         for line in handle:
@@ -142,6 +163,11 @@ def is_env_override(name: str) -> bool:
     return name in _EXTERNAL_ENV_KEYS
 
 
+def env_overrides(names: Iterable[str]) -> dict[str, str]:
+    """Current values of the given keys that are pinned by the external environment."""
+    return {name: os.environ.get(name, "") for name in names if name in _EXTERNAL_ENV_KEYS}
+
+
 def ensure_dir(path: str | None) -> None:
     if path and path not in {".", "./"}:
         os.makedirs(path, exist_ok=True)
@@ -177,13 +203,33 @@ def get_env_float(name: str, default: float = 0.0) -> float:
     raw = os.getenv(name)
     if raw is None:
         return default
-    return float(raw)
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning("[ENV] Invalid %s='%s', using default %s.", name, raw, default)
+        return default
 
 
 def get_env_tags(name: str) -> list[str]:
     return parse_tag_list(os.getenv(name))
 
 
+# Values read on hot request paths; refreshed by reload_cached_values() when config changes.
+AUTO_APPROVE_THRESHOLD = 0.0
+MANUAL_TAGS: tuple[str, ...] = ()
+AUTO_APPROVE_TAGS: tuple[str, ...] = ()
+
+
+def reload_cached_values() -> None:
+    global AUTO_APPROVE_THRESHOLD
+    global MANUAL_TAGS
+    global AUTO_APPROVE_TAGS
+
+    AUTO_APPROVE_THRESHOLD = get_env_float("AUTO_APPROVE_THRESHOLD", 0.0)
+    MANUAL_TAGS = tuple(get_env_tags("MANUAL_TAGS"))
+    AUTO_APPROVE_TAGS = tuple(get_env_tags("AUTO_APPROVE_TAGS"))
+
+
 _SENSITIVE_ENV_KEYS = (
     "KEY",
     "TOKEN",
@@ -194,6 +240,7 @@ _SENSITIVE_ENV_KEYS = (
     "BEARER",
     "PRIVATE",
 )
+_SENSITIVE_ENV_KEY_PATTERN = re.compile("|".join(map(re.escape, _SENSITIVE_ENV_KEYS)))
 
 _ENV_KEYS_TO_LOG = (
     "LOG_LEVEL",
@@ -203,6 +250,9 @@ _ENV_KEYS_TO_LOG = (
     "OPENAI_API_KEY",
     "OPENAI_MODEL",
     "OPENAI_BASE_URL",
+    "OPENAI_RPM",
+    "OPENAI_TPM",
+    "OPENAI_SEMANTIC_CACHE",
     "AUTO_APPROVE_THRESHOLD",
     "TRAINING_PAGE_SIZE",
     "MANUAL_TAGS",
@@ -211,12 +261,9 @@ _ENV_KEYS_TO_LOG = (
 
 
 def _should_mask_env_value(name: str, value: str) -> bool:
-    upper_name = name.upper()
-    if any(marker in upper_name for marker in _SENSITIVE_ENV_KEYS):
-        return True
-    if value.startswith("sk-") or value.startswith("rk-"):
+    if _SENSITIVE_ENV_KEY_PATTERN.search(name.upper()):
         return True
-    if value.startswith("Bearer ") or value.startswith("bearer "):
+    if value.startswith(("sk-", "rk-", "Bearer ", "bearer ")):
         return True
     if value.startswith("eyJ") and value.count(".") == 2:
         return True
@@ -249,19 +296,48 @@ SSE_HEADERS = {
     "X-Accel-Buffering": "no",
 }
 
-STREAM_YIELD_EVERY = 50
+# SSE comment sent when a stream has been idle this long, so proxies keep the connection open.
+SSE_KEEPALIVE_SECONDS = 15.0
 
+# Upper bound on transactions predicted concurrently for a single request.
+PREDICT_CONCURRENCY = 8
 
-load_environment()
+# Pages up to this size are rendered inline; the thread hop costs more than it saves.
+INLINE_DISPLAY_MAX_ROWS = 100
 
-DATA_DIR = os.getenv("DATA_DIR", ".")
-LOG_DIR = os.getenv("LOG_DIR")
-CONFIG_DIR = os.getenv("CONFIG_DIR")
 
-ensure_dirs(DATA_DIR, LOG_DIR, CONFIG_DIR)
+# Filled in by init_settings(); importing this module has no side effects.
+DATA_DIR = "."
+LOG_DIR: str | None = None
+CONFIG_DIR: str | None = None
+TRAINING_PAGE_SIZE = DEFAULT_TRAINING_PAGE_SIZE
 
-TRAINING_PAGE_SIZE = get_env_int(
-    "TRAINING_PAGE_SIZE",
-    DEFAULT_TRAINING_PAGE_SIZE,
-    min_value=1,
-)
+_INITIALIZED = False
+
+
+def init_settings() -> None:
+    """Load .env and the config file into the environment and create the data directories, once."""
+    global _INITIALIZED
+    global DATA_DIR
+    global LOG_DIR
+    global CONFIG_DIR
+    global TRAINING_PAGE_SIZE
+
+    if _INITIALIZED:
+        return
+    _INITIALIZED = True
+
+    load_environment()
+    reload_cached_values()
+
+    DATA_DIR = os.getenv("DATA_DIR", ".")
+    LOG_DIR = os.getenv("LOG_DIR")
+    CONFIG_DIR = os.getenv("CONFIG_DIR")
+
+    ensure_dirs(DATA_DIR, LOG_DIR, CONFIG_DIR)
+
+    TRAINING_PAGE_SIZE = get_env_int(
+        "TRAINING_PAGE_SIZE",
+        DEFAULT_TRAINING_PAGE_SIZE,
+        min_value=1,
+    )
@@ -1,45 +1,33 @@
+import sys
+from collections.abc import Iterable
+from functools import lru_cache
+from itertools import chain
 from typing import Any
 
 
+@lru_cache(maxsize=32)
+def _parse_tag_string(raw_tags: str) -> tuple[str, ...]:
+    # dict.fromkeys dedupes in insertion order
+    return tuple(dict.fromkeys(tag for part in raw_tags.split(",") if (tag := part.strip())))
+
+
 def parse_tag_list(raw_tags: str | None) -> list[str]:
     if not raw_tags:
         return []
-    parts = [part.strip() for part in raw_tags.split(",")]
-    tags: list[str] = []
-    seen = set()
-    for part in parts:
-        if part and part not in seen:
-            tags.append(part)
-            seen.add(part)
-    return tags
+    # The same few env values are parsed over and over; the cache holds immutable tuples
+    return list(_parse_tag_string(raw_tags))
 
 
 def normalize_tags(value: Any) -> list[str]:
     if not value:
         return []
     if isinstance(value, list):
-        tags: list[str] = []
-        seen = set()
-        for item in value:
-            tag = str(item).strip()
-            if tag and tag not in seen:
-                tags.append(tag)
-                seen.add(tag)
-        return tags
+        # Interned because the same few tags repeat across every transaction on a page
+        return list(dict.fromkeys(sys.intern(tag) for item in value if (tag := str(item).strip())))
     if isinstance(value, str):
         return parse_tag_list(value)
     return []
 
 
-def merge_tags(existing_tags: list[str] | None, new_tags: list[str]) -> list[str]:
-    merged: list[str] = []
-    seen = set()
-    for tag in existing_tags or []:
-        if tag and tag not in seen:
-            merged.append(tag)
-            seen.add(tag)
-    for tag in new_tags:
-        if tag and tag not in seen:
-            merged.append(tag)
-            seen.add(tag)
-    return merged
+def merge_tags(existing_tags: list[str] | None, new_tags: Iterable[str]) -> list[str]:
+    return list(dict.fromkeys(tag for tag in chain(existing_tags or (), new_tags) if tag))
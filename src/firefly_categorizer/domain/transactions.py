@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+import orjson
+
 from firefly_categorizer.domain.tags import normalize_tags
 from firefly_categorizer.models import CategorizationResult, Transaction
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TransactionSnapshot:
     transaction: Transaction
     transaction_id: str | int | None
@@ -18,21 +22,63 @@ class TransactionSnapshot:
     date: datetime
     category_name: str | None
     tags: list[str]
+    _raw_json: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def raw_json(self) -> str:
+        # Computed on first use; training builds snapshots but never renders them
+        raw_json = self._raw_json
+        if raw_json is None:
+            transaction = self.transaction
+            raw_json = transaction_json(
+                transaction.description,
+                transaction.amount,
+                transaction.date,
+                transaction.currency,
+                transaction.account_name,
+            )
+            object.__setattr__(self, "_raw_json", raw_json)
+        return raw_json
+
+
+def transaction_json(
+    description: str,
+    amount: float,
+    date: datetime,
+    currency: str,
+    account_name: str | None = None,
+) -> str:
+    """Serialize transaction fields exactly as Transaction.model_dump_json() would, without building the model."""
+    return orjson.dumps(
+        {
+            "description": description,
+            "amount": amount,
+            "date": date,
+            "account_name": account_name,
+            "currency": currency,
+        },
+        option=orjson.OPT_UTC_Z,
+    ).decode()
 
 
 def parse_date(value: str | datetime | None) -> datetime:
-    if isinstance(value, datetime):
-        return value
+    # Firefly payloads almost always carry strings, and a failed isinstance against datetime is the slow one
     if isinstance(value, str):
         try:
-            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+            return datetime.fromisoformat(value)
         except ValueError:
             return datetime.now()
+    if isinstance(value, datetime):
+        return value
     return datetime.now()
 
 
-def _extract_transaction_attrs(t_data: dict[str, Any]) -> dict[str, Any]:
-    attrs = t_data.get("attributes", {})
+def _intern(value: Any) -> Any:
+    # orjson shares decoded keys but not values; a page repeats the same few currencies and categories
+    return sys.intern(value) if type(value) is str else value
+
+
+def _extract_transaction_attrs(attrs: dict[str, Any]) -> dict[str, Any]:
     nested = attrs.get("transactions", [{}])
     if isinstance(nested, list) and nested:
         candidate = nested[0]
@@ -43,13 +89,14 @@ def _extract_transaction_attrs(t_data: dict[str, Any]) -> dict[str, Any]:
 
 def build_transaction_snapshot(t_data: dict[str, Any]) -> TransactionSnapshot:
     attrs = t_data.get("attributes", {})
-    tx_attrs = _extract_transaction_attrs(t_data)
-    description = tx_attrs.get("description", "")
-    amount = float(tx_attrs.get("amount", 0.0))
-    currency = tx_attrs.get("currency_code", "EUR")
-    date_value = parse_date(tx_attrs.get("date", ""))
-    category_name = tx_attrs.get("category_name")
-    tags = normalize_tags(tx_attrs.get("tags") or attrs.get("tags"))
+    # Runs once per transaction on every page; bind the lookup once
+    get = _extract_transaction_attrs(attrs).get
+    description = get("description", "")
+    amount = float(get("amount", 0.0))
+    currency = _intern(get("currency_code", "EUR"))
+    date_value = parse_date(get("date", ""))
+    category_name = _intern(get("category_name"))
+    tags = normalize_tags(get("tags") or attrs.get("tags"))
     tx_id = t_data.get("id")
 
     transaction = Transaction(
@@ -71,17 +118,32 @@ def build_transaction_snapshot(t_data: dict[str, Any]) -> TransactionSnapshot:
     )
 
 
+def build_transaction_display_row(t_data: dict[str, Any]) -> dict[str, Any]:
+    """Build a display row straight from the raw Firefly payload, without a snapshot."""
+    attrs = t_data.get("attributes", {})
+    get = _extract_transaction_attrs(attrs).get
+    description = get("description", "")
+    amount = float(get("amount", 0.0))
+    currency = _intern(get("currency_code", "EUR"))
+    date_value = parse_date(get("date", ""))
+    category_name = _intern(get("category_name"))
+
+    return {
+        "id": t_data.get("id"),
+        "date_formatted": date_value.date().isoformat(),
+        "description": description,
+        "amount": amount,
+        "currency": currency,
+        "prediction": None,
+        "existing_category": category_name,
+        "existing_tags": normalize_tags(get("tags") or attrs.get("tags")),
+        "auto_approved": False,
+        "raw_obj": transaction_json(description, amount, date_value, currency),
+    }
+
+
 def build_transactions_display(raw_txs: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    transactions_display = []
-    for t_data in raw_txs:
-        snapshot = build_transaction_snapshot(t_data)
-        transactions_display.append(build_transaction_payload(
-            snapshot,
-            prediction=None,
-            existing_category=snapshot.category_name,
-            auto_approved=False,
-        ))
-    return transactions_display
+    return [build_transaction_display_row(t_data) for t_data in raw_txs]
 
 
 def build_transaction_payload(
@@ -93,7 +155,7 @@ def build_transaction_payload(
 ) -> dict[str, Any]:
     return {
         "id": snapshot.transaction_id,
-        "date_formatted": snapshot.date.strftime("%Y-%m-%d"),
+        "date_formatted": snapshot.date.date().isoformat(),
         "description": snapshot.description,
         "amount": snapshot.amount,
         "currency": snapshot.currency,
@@ -101,37 +163,41 @@ def build_transaction_payload(
         "existing_category": existing_category,
         "existing_tags": snapshot.tags,
         "auto_approved": auto_approved,
-        "raw_obj": snapshot.transaction.model_dump_json(),
+        "raw_obj": snapshot.raw_json,
     }
 
 
 _WEBHOOK_ID_KEYS = ("transaction_id", "resource_id", "object_id", "entity_id", "id")
+_WEBHOOK_WRAPPER_KEYS = ("data", "content", "transaction", "attributes")
+_WEBHOOK_NESTED_KEYS = ("data", "content")
+_WEBHOOK_FIELD_KEYS = ("description", "amount", "date", "currency_code")
 
 
-def _iter_webhook_containers(payload: Any) -> list[dict[str, Any]]:
-    containers: list[dict[str, Any]] = []
-    if isinstance(payload, dict):
-        containers.append(payload)
-        for key in ("data", "content", "transaction", "attributes"):
-            value = payload.get(key)
-            if isinstance(value, dict):
-                containers.append(value)
+def _iter_webhook_containers(payload: Any) -> Iterator[dict[str, Any]]:
+    """
+    Yield the payload, its wrapper dicts, then whatever those nest one level down.
 
-    for container in list(containers):
+    Lazy, because callers stop at the first container that matches.
+    """
+    if not isinstance(payload, dict):
+        return
+    top_level = [payload]
+    top_level.extend(value for key in _WEBHOOK_WRAPPER_KEYS if isinstance(value := payload.get(key), dict))
+    yield from top_level
+
+    for container in top_level:
         attrs = container.get("attributes")
         if isinstance(attrs, dict):
-            containers.append(attrs)
-        for key in ("data", "content"):
+            yield attrs
+        for key in _WEBHOOK_NESTED_KEYS:
             nested = container.get(key)
             if isinstance(nested, dict):
-                containers.append(nested)
+                yield nested
         txs = container.get("transactions")
         if isinstance(txs, list) and txs:
             first_tx = txs[0]
             if isinstance(first_tx, dict):
-                containers.append(first_tx)
-
-    return containers
+                yield first_tx
 
 
 def extract_webhook_transaction_id(payload: dict[str, Any]) -> str | None:
@@ -147,7 +213,7 @@ def extract_webhook_transaction_snapshot(payload: dict[str, Any]) -> dict[str, A
     for container in _iter_webhook_containers(payload):
         if "attributes" in container or "transactions" in container:
             return container
-        if any(key in container for key in ("description", "amount", "date", "currency_code")):
+        if any(key in container for key in _WEBHOOK_FIELD_KEYS):
             return container
     return None
 
@@ -168,18 +234,19 @@ def parse_webhook_transaction(
     if not isinstance(tx_details, dict):
         return None, None, []
 
-    description = str(tx_details.get("description") or "")
+    get = tx_details.get
+    description = str(get("description") or "")
     try:
-        amount = float(tx_details.get("amount", 0.0))
+        amount = float(get("amount", 0.0))
     except (TypeError, ValueError):
         amount = 0.0
-    currency = tx_details.get("currency_code") or tx_details.get("currency") or "EUR"
-    date_raw = tx_details.get("date") or tx_details.get("created_at") or tx_details.get("updated_at")
+    currency = get("currency_code") or get("currency") or "EUR"
+    date_raw = get("date") or get("created_at") or get("updated_at")
 
     date_value = parse_date(date_raw)
 
-    category_name = tx_details.get("category_name") or attrs.get("category_name")
-    tags = normalize_tags(tx_details.get("tags") or attrs.get("tags"))
+    category_name = get("category_name") or attrs.get("category_name")
+    tags = normalize_tags(get("tags") or attrs.get("tags"))
 
     if not description:
         return None, category_name, tags
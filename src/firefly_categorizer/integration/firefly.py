@@ -1,18 +1,45 @@
 import asyncio
 import os
-from collections.abc import AsyncGenerator
+from collections import deque
+from collections.abc import AsyncGenerator, Sequence
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from time import monotonic
-from typing import Any
+from typing import Any, Self
 
 import httpx
+import orjson
 
+from firefly_categorizer.core import settings
 from firefly_categorizer.logger import get_logger
 
 logger = get_logger(__name__)
 
 DEFAULT_CATEGORIES_CACHE_TTL_SECONDS = 60.0
 DEFAULT_HTTP_TIMEOUT_SECONDS = 60.0
+# An unreachable Firefly should fail fast even when reads are allowed to take a while.
+HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+# Concurrent predictions and page prefetches share one pooled client per FireflyClient.
+# Idle connections outlive httpx's 5s default so paging through results reuses them.
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0)
+# Transaction pages in flight at once per FireflyClient, across all listings (FIREFLY_CONCURRENCY).
+PAGE_FETCH_CONCURRENCY = 8
+# Transaction updates in flight at once for update_transactions_bulk.
+UPDATE_CONCURRENCY = 16
+
+def _loads(response: httpx.Response) -> Any:
+    # orjson parses the multi-megabyte transaction pages several times faster than httpx's json()
+    return orjson.loads(response.content)
+
+def _retrieve_outcome(task: asyncio.Task[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
+
+def _discard(task: asyncio.Task[Any]) -> None:
+    """Cancel a fetch nobody will await, consuming any error it already raised so asyncio doesn't log it."""
+    task.cancel()
+    task.add_done_callback(_retrieve_outcome)
 
 def _parse_env_float(name: str, default: float) -> float:
     raw = os.getenv(name)
@@ -24,11 +51,14 @@ def _parse_env_float(name: str, default: float) -> float:
         logger.warning("[ENV] Invalid %s='%s', using default %.2f.", name, raw, default)
         return default
 
+# Split transactions in a journal share one created_at, and pages are re-sorted on every refresh
+@lru_cache(maxsize=4096)
 def _safe_timestamp(value: str | None) -> float:
     if not value:
         return 0.0
     try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        # Python 3.11+ parses a trailing "Z" natively
+        return datetime.fromisoformat(value).timestamp()
     except ValueError:
         return 0.0
 
@@ -55,6 +85,7 @@ class FireflyClient:
         client: httpx.AsyncClient | None = None,
         categories_cache_ttl: float | None = None,
         http_timeout: float | None = None,
+        page_concurrency: int | None = None,
     ):
         self.base_url = base_url or os.getenv("FIREFLY_URL")
         self.token = token or os.getenv("FIREFLY_TOKEN")
@@ -65,8 +96,17 @@ class FireflyClient:
         }
         self._client = client
         self._client_lock = asyncio.Lock()
+        # In-flight categories fetch that concurrent cache misses wait on together
+        self._categories_fetch: asyncio.Task[list[dict[str, Any]]] | None = None
+        # Bumped by refresh() so fetches started with old credentials can't repopulate the cache
+        self._categories_generation = 0
         self._categories_cache: list[dict[str, Any]] | None = None
         self._categories_cache_expires_at = 0.0
+        # Validator for the cached categories, so refreshes can be answered with 304 Not Modified
+        self._categories_etag: str | None = None
+        # Whether Firefly accepts sort=created_at on transaction listings; None until a listing finds out
+        self._sort_supported: bool | None = None
+        self._http_version_logged = False
         cache_ttl = categories_cache_ttl
         if cache_ttl is None:
             cache_ttl = _parse_env_float(
@@ -81,6 +121,12 @@ class FireflyClient:
                 DEFAULT_HTTP_TIMEOUT_SECONDS,
             )
         self._http_timeout = max(0.0, timeout)
+        concurrency = page_concurrency
+        if concurrency is None:
+            concurrency = settings.get_env_int("FIREFLY_CONCURRENCY", PAGE_FETCH_CONCURRENCY, min_value=1)
+        self._page_concurrency = max(1, concurrency)
+        # Shared by every listing, so overlapping fetches can't pile onto Firefly together
+        self._page_semaphore = asyncio.Semaphore(self._page_concurrency)
         logger.info("[INIT] FireflyClient initialized with timeout=%.2fs", self._http_timeout)
 
     def refresh(self, base_url: str | None = None, token: str | None = None) -> None:
@@ -95,6 +141,11 @@ class FireflyClient:
         }
         self._categories_cache = None
         self._categories_cache_expires_at = 0.0
+        self._categories_etag = None
+        self._sort_supported = None
+        # A fetch still running uses the old credentials; let the next miss start over
+        self._categories_fetch = None
+        self._categories_generation += 1
         self._categories_cache_ttl = _parse_env_float(
             "FIREFLY_CATEGORIES_TTL",
             DEFAULT_CATEGORIES_CACHE_TTL_SECONDS,
@@ -104,6 +155,12 @@ class FireflyClient:
         if self._client and not self._client.is_closed:
             await self._client.aclose()
 
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
     async def _get_client(self) -> httpx.AsyncClient:
         # Fast path: client already exists and is open
         client = self._client
@@ -115,7 +172,14 @@ class FireflyClient:
             # Double-check after acquiring lock to avoid creating multiple clients
             client = self._client
             if client is None or client.is_closed:
-                client = httpx.AsyncClient(timeout=self._http_timeout)
+                client = httpx.AsyncClient(
+                    timeout=httpx.Timeout(
+                        self._http_timeout,
+                        connect=min(self._http_timeout, HTTP_CONNECT_TIMEOUT_SECONDS),
+                    ),
+                    limits=HTTP_LIMITS,
+                    http2=True,
+                )
                 self._client = client
             return client
 
@@ -140,13 +204,14 @@ class FireflyClient:
         *,
         page: int,
         limit: int,
-        sort_supported: bool,
-    ) -> tuple[list[dict[str, Any]], dict[str, Any], bool]:
+    ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
         params: dict[str, Any] = {
             "limit": limit,
             "page": page,
         }
-        if sort_supported:
+        # Unknown until the first request tells us; remembered so later listings skip the rejected attempt
+        try_sort = self._sort_supported is not False
+        if try_sort:
             params["sort"] = "created_at"
             params["order"] = "asc"
 
@@ -165,14 +230,16 @@ class FireflyClient:
             "[FIREFLY] Paged transactions response headers received in %.2fs",
             monotonic() - started,
         )
+        if not self._http_version_logged:
+            # HTTP/2 is only used when the server or reverse proxy negotiates it via ALPN
+            self._http_version_logged = True
+            logger.info("[FIREFLY] Connected to Firefly over %s", response.http_version)
         try:
             response.raise_for_status()
+            if try_sort:
+                self._sort_supported = True
         except httpx.HTTPStatusError as exc:
-            if sort_supported and exc.response is not None and exc.response.status_code == 400:
-                sort_supported = False
-                logger.warning(
-                    "[TRAIN] Firefly does not support sort=created_at. Continuing without sorting."
-                )
+            if try_sort and exc.response is not None and exc.response.status_code == 400:
                 params.pop("sort", None)
                 params.pop("order", None)
                 response = await client.get(
@@ -181,12 +248,18 @@ class FireflyClient:
                     params=params,
                 )
                 response.raise_for_status()
+                # Only blame the sort parameters once the same request succeeds without them
+                if self._sort_supported is None:
+                    logger.warning(
+                        "[TRAIN] Firefly does not support sort=created_at. Continuing without sorting."
+                    )
+                self._sort_supported = False
             else:
                 raise
-        data = response.json()
+        data = _loads(response)
         transactions = data.get("data", [])
         meta = data.get("meta", {}).get("pagination", {})
-        return transactions, meta, sort_supported
+        return transactions, meta
 
     async def get_transactions(
         self,
@@ -208,9 +281,9 @@ class FireflyClient:
                 "type": "withdrawal", # Only work with withdrawals
             }
             if start_date:
-                params["start"] = start_date.strftime("%Y-%m-%d")
+                params["start"] = start_date.date().isoformat()
             if end_date:
-                params["end"] = end_date.strftime("%Y-%m-%d")
+                params["end"] = end_date.date().isoformat()
 
             logger.debug(
                 "[FIREFLY] Sending transactions request: %s params=%s",
@@ -228,7 +301,7 @@ class FireflyClient:
                 monotonic() - started,
             )
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response)
             return {
                 "data": data.get("data", []),
                 "meta": data.get("meta", {}).get("pagination", {})
@@ -237,37 +310,97 @@ class FireflyClient:
             logger.error("Error fetching transactions: %r", exc)
             raise
 
+    async def iter_transactions_pages(
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        limit: int = 50,
+        start_page: int = 1,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """Yield successive transaction pages, fetching the next page while the caller handles the current one."""
+        page = start_page
+
+        def fetch(page_number: int) -> asyncio.Task[dict[str, Any]]:
+            return asyncio.create_task(self.get_transactions(
+                start_date=start_date,
+                end_date=end_date,
+                limit=limit,
+                page=page_number,
+            ))
+
+        pending: asyncio.Task[dict[str, Any]] | None = fetch(page)
+        try:
+            while pending is not None:
+                result = await pending
+                pending = None
+                total_pages = result.get("meta", {}).get("total_pages", page)
+                if result.get("data") and page < int(total_pages):
+                    page += 1
+                    pending = fetch(page)
+                yield result
+        finally:
+            if pending is not None:
+                _discard(pending)
+
+    async def _fetch_sorted_page(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        page: int,
+        limit: int,
+    ) -> tuple[int, list[dict[str, Any]], dict[str, Any]]:
+        async with self._page_semaphore:
+            transactions, meta = await self._fetch_transactions_page(client, page=page, limit=limit)
+        _sort_transactions_by_created_at(transactions)
+        return page, transactions, meta
+
+    def _start_page_fetches(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        pages: range,
+        limit: int,
+    ) -> list[asyncio.Task[tuple[int, list[dict[str, Any]], dict[str, Any]]]]:
+        """Start fetching the given pages; the client's page semaphore bounds how many are in flight."""
+        return [
+            asyncio.create_task(self._fetch_sorted_page(client, page=page, limit=limit))
+            for page in pages
+        ]
+
     async def get_all_transactions(self, limit_per_page: int = 500) -> dict:
         """Fetch all transactions with pagination. Returns dict with transactions and metadata."""
         if not self.base_url or not self.token:
             return {"transactions": [], "total": 0}
 
-        all_transactions = []
+        all_transactions: list[dict[str, Any]] = []
         page = 1
         total_count = 0
-        sort_supported = True
 
         client = await self._get_client()
-        while True:
-            try:
-                transactions, meta, sort_supported = await self._fetch_transactions_page(
-                    client,
-                    page=page,
-                    limit=limit_per_page,
-                    sort_supported=sort_supported,
-                )
-
-                if not transactions:
-                    break
-
-                _sort_transactions_by_created_at(transactions)
-
+        # Page 1 tells us how many pages there are and whether sorting is supported
+        try:
+            transactions, meta = await self._fetch_transactions_page(
+                client,
+                page=page,
+                limit=limit_per_page,
+            )
+        except Exception as exc:
+            logger.error("Error fetching transactions page %s: %s", page, exc)
+            transactions, meta = [], {}
+        if not transactions:
+            return {"transactions": all_transactions, "total": total_count, "pages_fetched": page}
+
+        total_pages = int(meta.get("total_pages", 1))
+        tasks = self._start_page_fetches(
+            client,
+            pages=range(2, total_pages + 1),
+            limit=limit_per_page,
+        )
+        _sort_transactions_by_created_at(transactions)
+        try:
+            while True:
                 all_transactions.extend(transactions)
-
-                # Get pagination metadata
                 total_count = meta.get("total", len(all_transactions))
-                total_pages = meta.get("total_pages", 1)
-
                 logger.info(
                     "[TRAIN] Fetched page %s/%s: %s/%s transactions",
                     page,
@@ -275,14 +408,19 @@ class FireflyClient:
                     len(all_transactions),
                     total_count,
                 )
-
                 if page >= total_pages:
                     break
-
                 page += 1
-            except Exception as exc:
-                logger.error("Error fetching transactions page %s: %s", page, exc)
-                break
+                try:
+                    _, transactions, meta = await tasks[page - 2]
+                except Exception as exc:
+                    logger.error("Error fetching transactions page %s: %s", page, exc)
+                    break
+                if not transactions:
+                    break
+        finally:
+            for task in tasks:
+                _discard(task)
 
         return {
             "transactions": all_transactions,
@@ -298,35 +436,51 @@ class FireflyClient:
             return
 
         page = 1
-        sort_supported = True
-
         client = await self._get_client()
-        while True:
-            try:
-                transactions, meta, sort_supported = await self._fetch_transactions_page(
-                    client,
-                    page=page,
-                    limit=limit_per_page,
-                    sort_supported=sort_supported,
-                )
-
-                if not transactions:
-                    break
+        try:
+            transactions, meta = await self._fetch_transactions_page(
+                client,
+                page=page,
+                limit=limit_per_page,
+            )
+        except Exception as exc:
+            logger.error("Error fetching transactions page %s: %s", page, exc)
+            return
+        if not transactions:
+            return
+        _sort_transactions_by_created_at(transactions)
 
-                _sort_transactions_by_created_at(transactions)
+        # Keep a bounded window of later pages downloading while the caller works on the current one,
+        # without buffering the whole history in memory
+        upcoming = iter(range(2, int(meta.get("total_pages", 1)) + 1))
+        window: deque[asyncio.Task[tuple[int, list[dict[str, Any]], dict[str, Any]]]] = deque()
 
-                # Get pagination metadata
-                total_pages = meta.get("total_pages", 1)
+        def read_ahead() -> None:
+            for next_page in islice(upcoming, self._page_concurrency - len(window)):
+                window.append(asyncio.create_task(self._fetch_sorted_page(
+                    client,
+                    page=next_page,
+                    limit=limit_per_page,
+                )))
 
+        try:
+            read_ahead()
+            while True:
                 yield transactions, meta
-
-                if page >= total_pages:
+                if not window:
                     break
-
                 page += 1
-            except Exception as exc:
-                logger.error("Error fetching transactions page %s: %s", page, exc)
-                break
+                try:
+                    _, transactions, meta = await window.popleft()
+                except Exception as exc:
+                    logger.error("Error fetching transactions page %s: %s", page, exc)
+                    break
+                if not transactions:
+                    break
+                read_ahead()
+        finally:
+            for task in window:
+                _discard(task)
 
     async def stream_all_transactions(self, limit_per_page: int = 500) -> AsyncGenerator[dict[str, Any], None]:
         """Async generator that yields progress updates while fetching transactions."""
@@ -334,47 +488,63 @@ class FireflyClient:
             yield {"stage": "error", "message": "Firefly credentials missing"}
             return
 
-        all_transactions = []
-        page = 1
-        total_count = 0
-        sort_supported = True
-
         client = await self._get_client()
         # First request to get total count
-        while True:
-            try:
-                transactions, meta, sort_supported = await self._fetch_transactions_page(
-                    client,
-                    page=page,
-                    limit=limit_per_page,
-                    sort_supported=sort_supported,
-                )
-
-                if not transactions:
-                    break
-
-                _sort_transactions_by_created_at(transactions)
-
-                all_transactions.extend(transactions)
+        try:
+            transactions, meta = await self._fetch_transactions_page(
+                client,
+                page=1,
+                limit=limit_per_page,
+            )
+        except Exception as exc:
+            yield {"stage": "error", "message": str(exc)}
+            return
+        if not transactions:
+            yield {"stage": "fetch_complete", "transactions": [], "total": 0}
+            return
 
-                total_count = meta.get("total", len(all_transactions))
-                total_pages = meta.get("total_pages", 1)
+        _sort_transactions_by_created_at(transactions)
+        total_count = meta.get("total", len(transactions))
+        total_pages = int(meta.get("total_pages", 1))
+        pages: dict[int, list[dict[str, Any]]] = {1: transactions}
+        fetched = len(transactions)
 
-                # Yield fetch progress
-                yield {
-                    "stage": "fetching",
-                    "fetched": len(all_transactions),
-                    "total": total_count,
-                    "percent": round(len(all_transactions) / total_count * 100, 1) if total_count > 0 else 0
-                }
+        def progress() -> dict[str, Any]:
+            return {
+                "stage": "fetching",
+                "fetched": fetched,
+                "total": total_count,
+                "percent": round(fetched / total_count * 100, 1) if total_count > 0 else 0
+            }
 
-                if page >= total_pages:
-                    break
-                page += 1
+        yield progress()
 
-            except Exception as exc:
-                yield {"stage": "error", "message": str(exc)}
-                return
+        tasks = self._start_page_fetches(
+            client,
+            pages=range(2, total_pages + 1),
+            limit=limit_per_page,
+        )
+        # Report pages as they land, then put them back in page order
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    page, page_transactions, _ = await next_done
+                except Exception as exc:
+                    yield {"stage": "error", "message": str(exc)}
+                    return
+                pages[page] = page_transactions
+                fetched += len(page_transactions)
+                yield progress()
+        finally:
+            for task in tasks:
+                _discard(task)
+
+        all_transactions: list[dict[str, Any]] = []
+        for page in range(1, total_pages + 1):
+            # Like sequential paging, an empty page ends the listing
+            if not pages[page]:
+                break
+            all_transactions.extend(pages[page])
 
         # Yield final fetch complete with all transactions
         yield {
@@ -391,16 +561,52 @@ class FireflyClient:
             cached = self._get_cached_categories()
             if cached is not None:
                 return cached
+            if self._categories_cache_ttl > 0:
+                return await self._await_shared_categories_fetch(raise_on_error=raise_on_error)
+
+        return await self._fetch_categories(use_cache=use_cache, raise_on_error=raise_on_error)
+
+    async def _await_shared_categories_fetch(self, *, raise_on_error: bool) -> list[dict]:
+        # Waiters share the outcome too, so an unreachable Firefly costs one timeout rather than one each
+        fetch = self._categories_fetch
+        if fetch is None:
+            fetch = asyncio.create_task(self._fetch_categories(use_cache=True, raise_on_error=True))
+            fetch.add_done_callback(self._forget_categories_fetch)
+            self._categories_fetch = fetch
+        try:
+            # Shielded so one caller giving up doesn't cancel the fetch for the others
+            return await asyncio.shield(fetch)
+        except Exception:
+            if raise_on_error:
+                raise
+            cached = self._get_cached_categories(allow_stale=True)
+            return cached if cached is not None else []
+
+    def _forget_categories_fetch(self, fetch: asyncio.Task[list[dict[str, Any]]]) -> None:
+        if self._categories_fetch is fetch:
+            self._categories_fetch = None
+        # Mark the error as retrieved even if every waiter was cancelled
+        _retrieve_outcome(fetch)
 
+    async def _fetch_categories(self, *, use_cache: bool, raise_on_error: bool) -> list[dict]:
         client = await self._get_client()
+        generation = self._categories_generation
         try:
+            headers = self.headers
+            if use_cache and self._categories_etag and self._categories_cache is not None:
+                headers = {**headers, "If-None-Match": self._categories_etag}
             # Firefly API for categories
             response = await client.get(
                 f"{self.base_url}/api/v1/categories",
-                headers=self.headers,
+                headers=headers,
             )
+            if response.status_code == 304 and self._categories_cache is not None:
+                logger.debug("[FIREFLY] Categories not modified; keeping the cached list")
+                if generation == self._categories_generation:
+                    self._cache_categories(self._categories_cache)
+                return self._categories_cache
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response)
             categories = data.get("data", [])
             category_names = [
                 c.get("attributes", {}).get("name")
@@ -412,7 +618,10 @@ class FireflyClient:
                 len(category_names),
                 ", ".join(category_names) if category_names else "(none)",
             )
-            if use_cache:
+            if use_cache and generation == self._categories_generation:
+                # The validator must describe the cached list, so uncached fetches leave it alone
+                etag = response.headers.get("ETag")
+                self._categories_etag = etag if isinstance(etag, str) else None
                 self._cache_categories(categories)
             return categories
         except Exception as exc:
@@ -436,7 +645,7 @@ class FireflyClient:
                 headers=self.headers,
             )
             response.raise_for_status()
-            data = response.json()
+            data = _loads(response)
             return data.get("data")
         except Exception as exc:
             logger.error("Error fetching transaction %s: %s", transaction_id, exc)
@@ -467,10 +676,25 @@ class FireflyClient:
             response = await client.put(
                 f"{self.base_url}/api/v1/transactions/{transaction_id}",
                 headers=self.headers,
-                json=payload,
+                # self.headers already declares the JSON content type
+                content=orjson.dumps(payload),
             )
             response.raise_for_status()
             return True
         except Exception as exc:
             logger.error("Error updating transaction %s: %s", transaction_id, exc)
             return False
+
+    async def update_transactions_bulk(
+        self,
+        updates: Sequence[tuple[str, str, list[str] | None]],
+        concurrency: int = UPDATE_CONCURRENCY,
+    ) -> list[bool]:
+        """Apply (transaction_id, category_name, tags) updates concurrently; results keep the input order."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def update(transaction_id: str, category_name: str, tags: list[str] | None) -> bool:
+            async with semaphore:
+                return await self.update_transaction(transaction_id, category_name, tags)
+
+        return await asyncio.gather(*(update(*item) for item in updates))
@@ -1,10 +1,14 @@
+import asyncio
 import os
+import threading
 import time
+from contextlib import nullcontext
 
 from firefly_categorizer.classifiers.base import Classifier
 from firefly_categorizer.classifiers.llm import LLMClassifier
 from firefly_categorizer.classifiers.memory import MemoryMatcher
 from firefly_categorizer.classifiers.tfidf import TfidfClassifier
+from firefly_categorizer.core import settings
 from firefly_categorizer.logger import get_logger
 from firefly_categorizer.models import CategorizationResult, Category, Transaction
 
@@ -16,18 +20,22 @@ class CategorizerService:
                  tfidf_threshold: float = 0.5,
                  data_dir: str = "."):
 
+        self.data_dir = data_dir
         self.classifiers: list[Classifier] = []
+        # Guards the local models: predictions run concurrently in worker threads
+        # and auto-approval may learn while other transactions are being classified.
+        self._model_lock = threading.Lock()
 
         # 1. Memory Matcher (Highest priority)
         self.memory = MemoryMatcher(
-            data_path=os.path.join(data_dir, "memory.json"),
+            data_path=os.path.join(data_dir, "memory.sqlite"),
             threshold=memory_threshold
         )
         self.classifiers.append(self.memory)
 
         # 2. TF-IDF Classifier
         self.tfidf = TfidfClassifier(
-            data_path=os.path.join(data_dir, "tfidf.pkl"),
+            data_path=os.path.join(data_dir, "tfidf.npz"),
             threshold=tfidf_threshold
         )
         self.classifiers.append(self.tfidf)
@@ -38,35 +46,63 @@ class CategorizerService:
         if api_key:
             model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
             base_url = os.getenv("OPENAI_BASE_URL")
-            self.llm = LLMClassifier(api_key=api_key, model=model, base_url=base_url)
+            self.llm = LLMClassifier(
+                api_key=api_key,
+                model=model,
+                base_url=base_url,
+                requests_per_minute=settings.get_env_int("OPENAI_RPM", 0, min_value=0),
+                tokens_per_minute=settings.get_env_int("OPENAI_TPM", 0, min_value=0),
+                semantic_cache_threshold=settings.get_env_float("OPENAI_SEMANTIC_CACHE", 0.0),
+                semantic_cache_path=os.path.join(self.data_dir, "semantic_cache"),
+            )
             self.classifiers.append(self.llm)
             logger.info(f"LLM Classifier enabled: model={model}, base_url={base_url or 'default'}")
         else:
             self.llm = None
             logger.warning("OPENAI_API_KEY not found. LLM classifier disabled.")
 
-    def refresh_llm(self) -> None:
-        self.classifiers = [
-            classifier
-            for classifier in self.classifiers
-            if not isinstance(classifier, LLMClassifier)
-        ]
+    async def refresh_llm(self) -> None:
+        old_llm = self.llm
+        if old_llm:
+            # Hand the learned answers over to the replacement through the on-disk copy;
+            # writing the vectors (and loading them below) stays off the event loop
+            await asyncio.to_thread(old_llm.save_semantic_cache)
 
+        new_llm: LLMClassifier | None = None
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
             model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
             base_url = os.getenv("OPENAI_BASE_URL")
-            self.llm = LLMClassifier(api_key=api_key, model=model, base_url=base_url)
-            self.classifiers.append(self.llm)
+            new_llm = await asyncio.to_thread(
+                LLMClassifier,
+                api_key=api_key,
+                model=model,
+                base_url=base_url,
+                requests_per_minute=settings.get_env_int("OPENAI_RPM", 0, min_value=0),
+                tokens_per_minute=settings.get_env_int("OPENAI_TPM", 0, min_value=0),
+                semantic_cache_threshold=settings.get_env_float("OPENAI_SEMANTIC_CACHE", 0.0),
+                semantic_cache_path=os.path.join(self.data_dir, "semantic_cache"),
+            )
             logger.info(
                 "LLM Classifier refreshed: model=%s, base_url=%s",
                 model,
                 base_url or "default",
             )
         else:
-            self.llm = None
             logger.info("OPENAI_API_KEY not found. LLM classifier disabled.")
 
+        # Swap only once the replacement is ready, so categorization never runs without an LLM meanwhile
+        classifiers = [classifier for classifier in self.classifiers if classifier is not old_llm]
+        if new_llm:
+            classifiers.append(new_llm)
+        self.classifiers = classifiers
+        self.llm = new_llm
+
+        if old_llm:
+            # Release the replaced classifier's connection pools
+            old_llm.client.close()
+            await old_llm.aclient.close()
+
     def categorize(
         self, transaction: Transaction, valid_categories: list[str] | None = None
     ) -> CategorizationResult | None:
@@ -87,8 +123,11 @@ class CategorizerService:
                 logger.debug(f"Trying {classifier_name} for: '{transaction.description[:50]}...'")
 
                 start_classifier = time.perf_counter()
+                # The LLM holds no local state, so slow API calls do not block other threads
+                lock = nullcontext() if classifier is self.llm else self._model_lock
                 try:
-                    result = classifier.classify(transaction, valid_categories=valid_categories)
+                    with lock:
+                        result = classifier.classify(transaction, valid_categories=valid_categories)
                 finally:
                     duration_ms = (time.perf_counter() - start_classifier) * 1000
                     logger.info("[CATEGORIZE] %s took %.2fms", classifier_name, duration_ms)
@@ -132,13 +171,22 @@ class CategorizerService:
         Teach all trainable classifiers.
         """
         # We update Memory and TF-IDF. LLM usually isn't updated this way (RAG/Fine-tuning is complex).
-        self.memory.learn(transaction, category)
-        self.tfidf.learn(transaction, category)
+        with self._model_lock:
+            self.memory.learn(transaction, category)
+            self.tfidf.learn(transaction, category)
 
     def clear_models(self) -> None:
         """
         Clear all local training data.
         """
-        self.memory.clear()
-        self.tfidf.clear()
+        with self._model_lock:
+            self.memory.clear()
+            self.tfidf.clear()
         logger.info("All models cleared.")
+
+    def close(self) -> None:
+        """
+        Persist pending model updates and release local storage.
+        """
+        self.tfidf.flush()
+        self.memory.close()
@@ -1,6 +1,7 @@
 from datetime import datetime
+from functools import lru_cache
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class Transaction(BaseModel):
@@ -11,6 +12,9 @@ class Transaction(BaseModel):
     currency: str = "EUR"
 
 class Category(BaseModel):
+    # Frozen so classifiers can hand out shared instances (see category_named)
+    model_config = ConfigDict(frozen=True)
+
     name: str
     id: str | None = None # Firefly ID or internal ID
 
@@ -19,3 +23,9 @@ class CategorizationResult(BaseModel):
     confidence: float # 0.0 to 1.0
     source: str # "memory", "tfidf", "llm"
     model_version: str | None = None
+
+
+@lru_cache(maxsize=512)
+def category_named(name: str) -> Category:
+    """Shared, unvalidated Category for a name the classifiers produced themselves."""
+    return Category.model_construct(name=name)
@@ -1,4 +1,6 @@
 import asyncio
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+from typing import TypeVar
 
 from firefly_categorizer.core import settings
 from firefly_categorizer.domain.tags import merge_tags
@@ -10,6 +12,9 @@ from firefly_categorizer.models import CategorizationResult, Transaction
 
 logger = get_logger(__name__)
 
+SnapshotPrediction = tuple[CategorizationResult | None, str | None, bool]
+T = TypeVar("T")
+
 
 class CategorizationPipeline:
     def __init__(
@@ -68,7 +73,7 @@ class CategorizationPipeline:
         log_low_confidence: bool = False,
     ) -> tuple[str | None, float]:
         if threshold is None:
-            threshold = settings.get_env_float("AUTO_APPROVE_THRESHOLD", 0.0)
+            threshold = settings.AUTO_APPROVE_THRESHOLD
         if threshold <= 0:
             if log_disabled:
                 logger.info(
@@ -131,7 +136,7 @@ class CategorizationPipeline:
         *,
         valid_categories: list[str] | None = None,
         auto_approve_threshold: float = 0.0,
-    ) -> tuple[CategorizationResult | None, str | None, bool]:
+    ) -> SnapshotPrediction:
         existing_cat = snapshot.category_name
         prediction: CategorizationResult | None = None
         auto_approved = False
@@ -162,6 +167,63 @@ class CategorizationPipeline:
 
         return prediction, existing_cat, auto_approved
 
+    async def predict_snapshots(
+        self,
+        snapshots: Sequence[TransactionSnapshot],
+        *,
+        valid_categories: list[str] | None = None,
+        auto_approve_threshold: float = 0.0,
+        concurrency: int = settings.PREDICT_CONCURRENCY,
+    ) -> list[SnapshotPrediction]:
+        """Predict a batch of snapshots concurrently, preserving input order."""
+        run = self._bounded(concurrency)
+        return await asyncio.gather(*(
+            run(self.predict_for_snapshot(
+                snapshot,
+                valid_categories=valid_categories,
+                auto_approve_threshold=auto_approve_threshold,
+            ))
+            for snapshot in snapshots
+        ))
+
+    async def iter_snapshot_predictions(
+        self,
+        snapshots: Sequence[TransactionSnapshot],
+        *,
+        valid_categories: list[str] | None = None,
+        auto_approve_threshold: float = 0.0,
+        concurrency: int = settings.PREDICT_CONCURRENCY,
+    ) -> AsyncGenerator[tuple[TransactionSnapshot, SnapshotPrediction], None]:
+        """Predict snapshots concurrently, yielding each one as soon as it completes."""
+        run = self._bounded(concurrency)
+
+        async def predict(snapshot: TransactionSnapshot) -> tuple[TransactionSnapshot, SnapshotPrediction]:
+            return snapshot, await self.predict_for_snapshot(
+                snapshot,
+                valid_categories=valid_categories,
+                auto_approve_threshold=auto_approve_threshold,
+            )
+
+        tasks = [asyncio.create_task(run(predict(snapshot))) for snapshot in snapshots]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding predictions if the consumer goes away early
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _bounded(concurrency: int) -> Callable[[Awaitable[T]], Awaitable[T]]:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(awaitable: Awaitable[T]) -> T:
+            async with semaphore:
+                return await awaitable
+
+        return run
+
     async def apply_auto_approval(
         self,
         transaction_id: str | int,
@@ -185,7 +247,7 @@ class CategorizationPipeline:
                 threshold_value,
             )
 
-        auto_tags = settings.get_env_tags("AUTO_APPROVE_TAGS")
+        auto_tags = settings.AUTO_APPROVE_TAGS
         if auto_tags:
             tags_payload = merge_tags(existing_tags, auto_tags)
         else:
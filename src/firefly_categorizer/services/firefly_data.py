@@ -1,15 +1,30 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any
 
 from firefly_categorizer.integration.firefly import FireflyClient
 from firefly_categorizer.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Names derived from the last category payload, keyed by the payload's identity.
+# FireflyClient returns the same list object while its TTL cache is fresh.
+_CATEGORY_NAMES_MEMO: tuple[list[dict[str, Any]], list[str], list[str]] | None = None
+
 
 def is_all_scope(scope: str | None) -> bool:
     return (scope or "").lower() == "all"
 
 
+DEFAULT_RANGE_DAYS = 30
+
+
+@lru_cache(maxsize=2)
+def default_date_strings(today: date) -> tuple[str, str]:
+    start = today - timedelta(days=DEFAULT_RANGE_DAYS)
+    return start.isoformat(), today.isoformat()
+
+
 def resolve_date_range(
     start_date: str | None,
     end_date: str | None,
@@ -18,13 +33,14 @@ def resolve_date_range(
     if is_all_scope(scope):
         return None, None
 
+    now = datetime.now()
     if not start_date:
-        start_date_obj = datetime.now() - timedelta(days=30)
+        start_date_obj = now - timedelta(days=DEFAULT_RANGE_DAYS)
     else:
         start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
 
     if not end_date:
-        end_date_obj = datetime.now()
+        end_date_obj = now
     else:
         end_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
 
@@ -38,8 +54,8 @@ async def fetch_category_names(
     raise_on_error: bool = False,
 ) -> list[str]:
     raw_cats = await firefly.get_categories(raise_on_error=raise_on_error)
-    categories = [c["attributes"]["name"] for c in raw_cats] if raw_cats else []
-    result = sorted(categories) if sort else categories
+    categories, sorted_categories = _category_names(raw_cats)
+    result = list(sorted_categories if sort else categories)
     logger.debug(
         "[CATEGORIES] Processed %d category names%s: %s",
         len(result),
@@ -47,3 +63,17 @@ async def fetch_category_names(
         ", ".join(result) if result else "(none)",
     )
     return result
+
+
+def _category_names(raw_cats: list[dict[str, Any]]) -> tuple[list[str], list[str]]:
+    global _CATEGORY_NAMES_MEMO
+
+    memo = _CATEGORY_NAMES_MEMO
+    if memo is not None and memo[0] is raw_cats:
+        return memo[1], memo[2]
+
+    categories = [c["attributes"]["name"] for c in raw_cats] if raw_cats else []
+    sorted_categories = sorted(categories)
+    if raw_cats:
+        _CATEGORY_NAMES_MEMO = (raw_cats, categories, sorted_categories)
+    return categories, sorted_categories
@@ -1,9 +1,14 @@
-from collections.abc import Generator
+import asyncio
+import json
+from collections.abc import AsyncGenerator, Generator
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
 
+from firefly_categorizer.api.routes.transactions import _with_keepalive
+from firefly_categorizer.api.state import services
+from firefly_categorizer.core import settings
 from firefly_categorizer.main import app
 from firefly_categorizer.models import CategorizationResult, Category
 from firefly_categorizer.services.categorization import CategorizationPipeline
@@ -12,34 +17,22 @@ client = TestClient(app)
 
 @pytest.fixture
 def mock_firefly() -> Generator[AsyncMock, None, None]:
-    had_firefly = hasattr(app.state, "firefly")
-    original_firefly = getattr(app.state, "firefly", None)
+    original_firefly = services.firefly
     mock = AsyncMock()
-    app.state.firefly = mock
+    services.firefly = mock
     yield mock
-    if had_firefly:
-        app.state.firefly = original_firefly
-    else:
-        delattr(app.state, "firefly")
+    services.firefly = original_firefly
 
 @pytest.fixture
 def mock_service(mock_firefly: AsyncMock) -> Generator[MagicMock, None, None]:
-    had_service = hasattr(app.state, "service")
-    had_pipeline = hasattr(app.state, "pipeline")
-    original_service = getattr(app.state, "service", None)
-    original_pipeline = getattr(app.state, "pipeline", None)
+    original_service = services.service
+    original_pipeline = services.pipeline
     mock = MagicMock()
-    app.state.service = mock
-    app.state.pipeline = CategorizationPipeline(service=mock, firefly=mock_firefly)
+    services.service = mock
+    services.pipeline = CategorizationPipeline(service=mock, firefly=mock_firefly)
     yield mock
-    if had_service:
-        app.state.service = original_service
-    else:
-        delattr(app.state, "service")
-    if had_pipeline:
-        app.state.pipeline = original_pipeline
-    else:
-        delattr(app.state, "pipeline")
+    services.service = original_service
+    services.pipeline = original_pipeline
 
 def test_get_transactions_no_predict(mock_firefly: AsyncMock, mock_service: MagicMock) -> None:
     # Mock Firefly returning uncategorized transactions
@@ -75,7 +68,7 @@ def test_get_transactions_with_predict(
     mock_service: MagicMock,
     monkeypatch: pytest.MonkeyPatch
 ) -> None:
-    monkeypatch.setenv("AUTO_APPROVE_THRESHOLD", "0")
+    monkeypatch.setattr(settings, "AUTO_APPROVE_THRESHOLD", 0.0)
     # Mock Firefly returning uncategorized transactions
     mock_firefly.get_categories.return_value = [{"attributes": {"name": "Food"}}]
     mock_firefly.get_transactions.return_value = {
@@ -113,6 +106,126 @@ def test_get_transactions_with_predict(
     assert data["transactions"][0]["prediction"]["category"]["name"] == "Food"
 
 
+
+def test_get_transactions_all_pages_reports_prediction_errors_as_server_errors(
+    mock_firefly: AsyncMock,
+    mock_service: MagicMock,
+) -> None:
+    mock_firefly.get_categories.return_value = [{"attributes": {"name": "Food"}}]
+
+    async def pages(**_: object) -> AsyncGenerator[dict, None]:
+        yield {
+            "data": [{
+                "id": "1",
+                "attributes": {
+                    "transactions": [{
+                        "description": "uncategorized tx",
+                        "amount": "10.00",
+                        "date": "2023-01-01T10:00:00Z",
+                        "category_name": None
+                    }]
+                }
+            }],
+            "meta": {"total": 1}
+        }
+
+    mock_firefly.iter_transactions_pages = pages
+    mock_service.categorize.side_effect = RuntimeError("classifier broke")
+
+    with pytest.raises(RuntimeError, match="classifier broke"):
+        client.get("/api/transactions?predict=true&all_pages=true")
+
+def test_get_transactions_all_pages_reports_page_errors_as_bad_gateway(mock_firefly: AsyncMock) -> None:
+    mock_firefly.get_categories.return_value = []
+
+    async def pages(**_: object) -> AsyncGenerator[dict, None]:
+        raise ConnectionError("Firefly down")
+        yield {}
+
+    mock_firefly.iter_transactions_pages = pages
+
+    response = client.get("/api/transactions?all_pages=true")
+    assert response.status_code == 502
+    assert "Firefly down" in response.json()["detail"]
+
+
+def test_categorize_stream_emits_every_transaction(
+    mock_firefly: AsyncMock,
+    mock_service: MagicMock,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "AUTO_APPROVE_THRESHOLD", 0.0)
+    mock_firefly.get_categories.return_value = [{"attributes": {"name": "Food"}}]
+    mock_firefly.get_transactions.return_value = {
+        "data": [
+            {
+                "id": str(idx),
+                "attributes": {
+                    "transactions": [{
+                        "description": f"tx {idx}",
+                        "amount": "10.00",
+                        "date": "2023-01-01T10:00:00Z",
+                        "category_name": None
+                    }]
+                }
+            }
+            for idx in range(5)
+        ],
+        "meta": {"total": 5}
+    }
+    mock_service.categorize.return_value = CategorizationResult(
+        category=Category(name="Food"),
+        confidence=0.9,
+        source="mock"
+    )
+
+    response = client.get("/api/categorize-stream")
+    assert response.status_code == 200
+    assert response.text.startswith(": connected\n\n")
+
+    events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: {\"")]
+    assert sorted(event["id"] for event in events) == ["0", "1", "2", "3", "4"]
+    assert all(event["prediction"]["category"]["name"] == "Food" for event in events)
+    assert response.text.rstrip().endswith("event: done\ndata: {}")
+    assert mock_service.categorize.call_count == 5
+
+
+@pytest.mark.anyio
+async def test_iter_snapshot_predictions_waits_for_cancelled_predictions() -> None:
+    pipeline = CategorizationPipeline(service=MagicMock(), firefly=None)
+    cancelled: list[str] = []
+
+    async def predict_for_snapshot(snapshot: object, **_: object) -> tuple[None, None, bool]:
+        if snapshot == "fast":
+            return None, None, False
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(str(snapshot))
+            raise
+        return None, None, False
+
+    pipeline.predict_for_snapshot = predict_for_snapshot
+    predictions = pipeline.iter_snapshot_predictions(["fast", "slow-1", "slow-2"])
+
+    assert await anext(predictions) == ("fast", (None, None, False))
+    await predictions.aclose()
+
+    assert sorted(cancelled) == ["slow-1", "slow-2"]
+
+@pytest.mark.anyio
+async def test_stream_keepalive_while_source_is_idle() -> None:
+    async def slow_source() -> AsyncGenerator[bytes, None]:
+        yield b"data: 1\n\n"
+        await asyncio.sleep(0.05)
+        yield b"data: 2\n\n"
+
+    chunks = [chunk async for chunk in _with_keepalive(slow_source(), 0.01)]
+
+    assert chunks[0] == b": connected\n\n"
+    assert b": keepalive\n\n" in chunks
+    assert [chunk for chunk in chunks if chunk.startswith(b"data:")] == [b"data: 1\n\n", b"data: 2\n\n"]
+
 def test_get_categories(mock_firefly: AsyncMock) -> None:
     mock_firefly.get_categories.return_value = [
         {"attributes": {"name": "Food"}},
@@ -131,19 +244,16 @@ def test_get_categories_error(mock_firefly: AsyncMock) -> None:
     assert "Firefly error" in response.json()["detail"]
 
 def test_get_categories_no_firefly() -> None:
-    had_firefly = hasattr(app.state, "firefly")
-    original_firefly = getattr(app.state, "firefly", None)
-    # Ensure firefly is NOT in app.state
-    if had_firefly:
-        delattr(app.state, "firefly")
+    original_firefly = services.firefly
+    # Ensure firefly is not configured
+    services.firefly = None
 
     try:
         response = client.get("/api/categories")
         assert response.status_code == 200
         assert response.json() == []
     finally:
-        if had_firefly:
-            app.state.firefly = original_firefly
+        services.firefly = original_firefly
 
 def test_get_categories_empty(mock_firefly: AsyncMock) -> None:
     mock_firefly.get_categories.return_value = []
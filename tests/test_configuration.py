@@ -0,0 +1,37 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from firefly_categorizer.core import configuration, settings
+
+
+@pytest.fixture
+def config_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "config.yaml"
+    monkeypatch.setattr(settings, "_CONFIG_FILE_PATH", str(path))
+    # setenv first so monkeypatch restores the variable the updates below will set
+    monkeypatch.setenv("TRAINING_PAGE_SIZE", "")
+    monkeypatch.delenv("TRAINING_PAGE_SIZE")
+    monkeypatch.setattr(settings, "_EXTERNAL_ENV_KEYS", set())
+    return path
+
+
+def test_apply_config_updates_skips_unchanged_values(config_file: Path) -> None:
+    errors, updates = configuration.apply_config_updates({"TRAINING_PAGE_SIZE": "25"})
+    assert errors == {}
+    assert updates == {"TRAINING_PAGE_SIZE": "25"}
+    assert settings.read_config_file(str(config_file))["TRAINING_PAGE_SIZE"] == "25"
+
+    with patch.object(configuration, "_write_config_file") as write:
+        errors, updates = configuration.apply_config_updates({"TRAINING_PAGE_SIZE": "25"})
+    assert errors == {}
+    assert updates == {}
+    write.assert_not_called()
+
+
+def test_apply_config_updates_ignores_unknown_form_keys(config_file: Path) -> None:
+    errors, updates = configuration.apply_config_updates({"TRAINING_PAGE_SIZE": "25", "csrf_token": "abc"})
+    assert errors == {}
+    assert updates == {"TRAINING_PAGE_SIZE": "25"}
+    assert "csrf_token" not in settings.read_config_file(str(config_file))
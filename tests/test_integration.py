@@ -1,19 +1,69 @@
-from collections.abc import AsyncGenerator
+import asyncio
+import gc
+from collections.abc import AsyncGenerator, Callable
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
+import orjson
 import pytest
 
-from firefly_categorizer.integration.firefly import FireflyClient
+from firefly_categorizer.integration.firefly import PAGE_FETCH_CONCURRENCY, FireflyClient
 
 
 def _categories_response(categories: list[dict[str, Any]]) -> MagicMock:
     response = MagicMock()
     response.raise_for_status.return_value = None
-    response.json.return_value = {"data": categories}
+    response.content = orjson.dumps({"data": categories})
     return response
 
 
+class _RequestStats:
+    """Counts overlapping mocked requests and remembers the peak."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def track(self, delay: float) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(delay)
+        self.in_flight -= 1
+
+
+def _paged_client(
+    total_pages: int,
+    *,
+    delay: Callable[[int], float] = lambda page: 0.005,
+    **client_kwargs: Any,
+) -> tuple[FireflyClient, _RequestStats]:
+    """A FireflyClient over one-transaction pages, tracking how many follow-up pages are fetched at once.
+
+    Page 1 is requested alone to learn the page count, so only later pages are counted.
+    """
+    stats = _RequestStats()
+
+    async def get(url: str, *, headers: dict[str, str], params: dict[str, Any]) -> MagicMock:
+        page = params["page"]
+        if page > 1:
+            await stats.track(delay(page))
+        else:
+            await asyncio.sleep(delay(page))
+        response = MagicMock()
+        response.raise_for_status.return_value = None
+        response.content = orjson.dumps({
+            "data": [{"id": str(page), "attributes": {"created_at": f"2024-01-{page:02d}T00:00:00Z"}}],
+            "meta": {"pagination": {"total": total_pages, "total_pages": total_pages}},
+        })
+        return response
+
+    mock_client = AsyncMock()
+    mock_client.is_closed = False
+    mock_client.get = AsyncMock(side_effect=get)
+    return FireflyClient(base_url="http://test", token="token", client=mock_client, **client_kwargs), stats
+
+
 @pytest.mark.anyio
 async def test_firefly_yield_transactions() -> None:
     """Test that yield_transactions yields pages correctly."""
@@ -36,11 +86,11 @@ async def test_firefly_yield_transactions() -> None:
 
         # Setup responses for 2 calls
         mock_resp1 = MagicMock()
-        mock_resp1.json.return_value = page1_data
+        mock_resp1.content = orjson.dumps(page1_data)
         mock_resp1.raise_for_status.return_value = None
 
         mock_resp2 = MagicMock()
-        mock_resp2.json.return_value = page2_data
+        mock_resp2.content = orjson.dumps(page2_data)
         mock_resp2.raise_for_status.return_value = None
 
         # Use AsyncMock for the get method so it can be awaited
@@ -60,6 +110,202 @@ async def test_firefly_yield_transactions() -> None:
     assert pages[1][0][0]["id"] == "2"
 
 
+@pytest.mark.anyio
+async def test_firefly_iter_transactions_pages_prefetches_next_page() -> None:
+    """The next page should be requested before the caller resumes iteration."""
+    pages_data = [
+        {
+            "data": [{"id": str(page), "attributes": {"transactions": [{"description": f"t{page}"}]}}],
+            "meta": {"pagination": {"total": 2, "total_pages": 2, "current_page": page}},
+        }
+        for page in (1, 2)
+    ]
+    responses = []
+    for page_data in pages_data:
+        response = MagicMock()
+        response.content = orjson.dumps(page_data)
+        response.raise_for_status.return_value = None
+        responses.append(response)
+
+    mock_client = AsyncMock()
+    mock_client.is_closed = False
+    mock_client.get = AsyncMock(side_effect=responses)
+    client = FireflyClient(base_url="http://test", token="token", client=mock_client)
+
+    pages = []
+    async for result in client.iter_transactions_pages(limit=1):
+        await asyncio.sleep(0)
+        if not pages:
+            assert mock_client.get.call_count == 2
+        pages.append(result)
+
+    assert [page["data"][0]["id"] for page in pages] == ["1", "2"]
+    assert pages[-1]["meta"]["current_page"] == 2
+    assert mock_client.get.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_firefly_abandoned_page_fetch_errors_are_retrieved() -> None:
+    """A prefetched page that fails while being cancelled doesn't log 'exception was never retrieved'."""
+    loop = asyncio.get_running_loop()
+    unhandled: list[dict[str, Any]] = []
+    loop.set_exception_handler(lambda _, context: unhandled.append(context))
+
+    async def get(url: str, *, headers: dict[str, str], params: dict[str, Any]) -> MagicMock:
+        if params["page"] > 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                raise RuntimeError("connection reset") from None
+        response = MagicMock()
+        response.raise_for_status.return_value = None
+        response.content = orjson.dumps({
+            "data": [{"id": "1", "attributes": {}}],
+            "meta": {"pagination": {"total": 3, "total_pages": 3}},
+        })
+        return response
+
+    mock_client = AsyncMock()
+    mock_client.is_closed = False
+    mock_client.get = AsyncMock(side_effect=get)
+    client = FireflyClient(base_url="http://test", token="token", client=mock_client)
+
+    try:
+        pages = client.iter_transactions_pages(limit=1)
+        await anext(pages)
+        await asyncio.sleep(0)
+        await pages.aclose()
+
+        transactions = client.yield_transactions(limit_per_page=1)
+        await anext(transactions)
+        await asyncio.sleep(0)
+        await transactions.aclose()
+
+        del pages, transactions
+        await asyncio.sleep(0.01)
+        gc.collect()
+    finally:
+        loop.set_exception_handler(None)
+
+    assert unhandled == []
+
+
+@pytest.mark.anyio
+async def test_firefly_all_transactions_fetches_pages_concurrently() -> None:
+    """Pages after the first are requested together and reassembled in page order."""
+    total_pages = 4
+    # Later pages answer first
+    client, stats = _paged_client(total_pages, delay=lambda page: 0.01 * (total_pages - page))
+
+    result = await client.get_all_transactions(limit_per_page=1)
+    assert [tx["id"] for tx in result["transactions"]] == ["1", "2", "3", "4"]
+    assert result["pages_fetched"] == total_pages
+    assert stats.max_in_flight == total_pages - 1
+
+    updates = [update async for update in client.stream_all_transactions(limit_per_page=1)]
+    assert [update["fetched"] for update in updates[:-1]] == [1, 2, 3, 4]
+    assert updates[-1]["stage"] == "fetch_complete"
+    assert [tx["id"] for tx in updates[-1]["transactions"]] == ["1", "2", "3", "4"]
+
+@pytest.mark.anyio
+async def test_firefly_yield_transactions_reads_ahead_in_a_bounded_window() -> None:
+    """Later pages are fetched while earlier ones are consumed, in order, without fetching everything at once."""
+    total_pages = 12
+    client, stats = _paged_client(total_pages, delay=lambda page: 0.001 * (total_pages - page))
+
+    pages = [txs[0]["id"] async for txs, _ in client.yield_transactions(limit_per_page=1)]
+
+    assert pages == [str(page) for page in range(1, total_pages + 1)]
+    assert 1 < stats.max_in_flight <= PAGE_FETCH_CONCURRENCY
+
+@pytest.mark.anyio
+async def test_firefly_page_concurrency_is_shared_across_listings() -> None:
+    """Overlapping listings together stay within the client's page concurrency."""
+    client, stats = _paged_client(6, page_concurrency=2)
+
+    async def consume_pages() -> int:
+        return len([page async for page in client.yield_transactions(limit_per_page=1)])
+
+    results = await asyncio.gather(client.get_all_transactions(limit_per_page=1), consume_pages())
+
+    assert len(results[0]["transactions"]) == 6
+    assert results[1] == 6
+    assert stats.max_in_flight == 2
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [("3", 3), ("inf", PAGE_FETCH_CONCURRENCY), ("nan", PAGE_FETCH_CONCURRENCY), ("2.5", PAGE_FETCH_CONCURRENCY)],
+)
+def test_firefly_page_concurrency_from_env(monkeypatch: pytest.MonkeyPatch, raw: str, expected: int) -> None:
+    monkeypatch.setenv("FIREFLY_CONCURRENCY", raw)
+
+    client = FireflyClient(base_url="http://test", token="token")
+
+    assert client._page_concurrency == expected
+
+
+@pytest.mark.anyio
+async def test_firefly_remembers_unsupported_sort() -> None:
+    """Once Firefly rejects sort=created_at, later listings don't try it again."""
+    requests: list[httpx.QueryParams] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.params)
+        if "sort" in request.url.params:
+            return httpx.Response(400)
+        page = int(request.url.params["page"])
+        return httpx.Response(200, json={
+            "data": [{"id": str(page), "attributes": {}}],
+            "meta": {"pagination": {"total": 2, "total_pages": 2}},
+        })
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = FireflyClient(base_url="http://test", token="token", client=http_client)
+
+    first = [page async for page in client.yield_transactions(limit_per_page=1)]
+    assert len(first) == 2
+    assert len(requests) == 3
+
+    requests.clear()
+    second = await client.get_all_transactions(limit_per_page=1)
+    assert len(second["transactions"]) == 2
+    assert [params.get("sort") for params in requests] == [None, None]
+    await http_client.aclose()
+
+
+@pytest.mark.anyio
+async def test_firefly_update_transactions_bulk_runs_concurrently() -> None:
+    """Bulk updates overlap up to the concurrency limit and report results in input order."""
+    stats = _RequestStats()
+
+    async def put(url: str, *, headers: dict[str, str], content: bytes) -> MagicMock:
+        await stats.track(0.01)
+        response = MagicMock()
+        if url.endswith("/3"):
+            response.raise_for_status.side_effect = RuntimeError("boom")
+        return response
+
+    mock_client = AsyncMock()
+    mock_client.is_closed = False
+    mock_client.put = AsyncMock(side_effect=put)
+    client = FireflyClient(base_url="http://test", token="token", client=mock_client)
+
+    updates = [(str(tx_id), "Food", None) for tx_id in range(1, 6)]
+    results = await client.update_transactions_bulk(updates, concurrency=2)
+
+    assert results == [True, True, False, True, True]
+    assert stats.max_in_flight == 2
+
+@pytest.mark.anyio
+async def test_firefly_client_context_manager_closes_pool() -> None:
+    """The pooled client is reused across calls and closed when the context exits."""
+    async with FireflyClient(base_url="http://test", token="token") as client:
+        http_client = await client._get_client()
+        assert await client._get_client() is http_client
+    assert http_client.is_closed
+
+
 @pytest.mark.anyio
 async def test_firefly_categories_cache_ttl_expires() -> None:
     """Fetch again after TTL expiration."""
@@ -161,6 +407,141 @@ async def test_firefly_categories_cache_stale_fallback_on_error() -> None:
     assert second == categories
     assert mock_client.get.call_count == 2
 
+@pytest.mark.anyio
+async def test_firefly_categories_revalidates_with_etag() -> None:
+    """An expired cache is revalidated with If-None-Match and kept on 304."""
+    categories = [{"id": "1", "attributes": {"name": "Food"}}]
+    seen_etags: list[str | None] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"data": categories}, headers={"ETag": '"v1"'})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = FireflyClient(base_url="http://test", token="token", client=http_client, categories_cache_ttl=1)
+
+    with patch(
+        "firefly_categorizer.integration.firefly.monotonic",
+        side_effect=[0.0, 2.0, 2.0, 2.5],
+    ):
+        first = await client.get_categories()
+        second = await client.get_categories()
+        third = await client.get_categories()
+
+    assert first == categories
+    assert second is first
+    assert third is first
+    assert seen_etags == [None, '"v1"']
+    await http_client.aclose()
+
+@pytest.mark.anyio
+async def test_firefly_uncached_categories_fetch_keeps_the_etag() -> None:
+    """A use_cache=False fetch must not swap in a validator for a list that isn't cached."""
+    old = [{"id": "1", "attributes": {"name": "Food"}}]
+    new = [{"id": "2", "attributes": {"name": "Rent"}}]
+    seen_etags: list[str | None] = []
+    responses = iter([
+        httpx.Response(200, json={"data": old}, headers={"ETag": '"v1"'}),
+        httpx.Response(200, json={"data": new}, headers={"ETag": '"v2"'}),
+        httpx.Response(200, json={"data": new}, headers={"ETag": '"v2"'}),
+    ])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_etags.append(request.headers.get("If-None-Match"))
+        return next(responses)
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = FireflyClient(base_url="http://test", token="token", client=http_client, categories_cache_ttl=60)
+
+    assert await client.get_categories() == old
+    assert await client.get_categories(use_cache=False) == new
+    client._categories_cache_expires_at = 0.0
+    assert await client.get_categories() == new
+
+    assert seen_etags == [None, None, '"v1"']
+    await http_client.aclose()
+
+@pytest.mark.anyio
+async def test_firefly_categories_concurrent_misses_share_fetch() -> None:
+    """Concurrent cache misses should trigger a single Firefly request."""
+    categories = [{"id": "1", "attributes": {"name": "Food"}}]
+
+    async def slow_get(*args: Any, **kwargs: Any) -> MagicMock:
+        await asyncio.sleep(0.01)
+        return _categories_response(categories)
+
+    mock_client = AsyncMock()
+    mock_client.is_closed = False
+    mock_client.get = AsyncMock(side_effect=slow_get)
+
+    client = FireflyClient(
+        base_url="http://test",
+        token="token",
+        client=mock_client,
+        categories_cache_ttl=60,
+    )
+
+    results = await asyncio.gather(*(client.get_categories() for _ in range(5)))
+
+    assert all(result == categories for result in results)
+    assert mock_client.get.call_count == 1
+
+@pytest.mark.anyio
+async def test_firefly_refresh_discards_categories_from_an_in_flight_fetch() -> None:
+    """A fetch started before refresh() must not fill the cache with the old server's categories."""
+    old = [{"id": "1", "attributes": {"name": "Old"}}]
+    new = [{"id": "2", "attributes": {"name": "New"}}]
+    old_requested = asyncio.Event()
+    release_old = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "old":
+            old_requested.set()
+            await release_old.wait()
+            return httpx.Response(200, json={"data": old}, headers={"ETag": '"old"'})
+        return httpx.Response(200, json={"data": new})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = FireflyClient(base_url="http://old", token="token", client=http_client, categories_cache_ttl=60)
+
+    pending = asyncio.create_task(client.get_categories())
+    await old_requested.wait()
+    client.refresh(base_url="http://new", token="token")
+    release_old.set()
+
+    assert await pending == old
+    assert await client.get_categories() == new
+    assert client._categories_etag is None
+    await http_client.aclose()
+
+@pytest.mark.anyio
+async def test_firefly_categories_concurrent_misses_share_failure() -> None:
+    """A failing fetch is not retried by every waiter in turn."""
+    async def failing_get(*args: Any, **kwargs: Any) -> MagicMock:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    mock_client = AsyncMock()
+    mock_client.is_closed = False
+    mock_client.get = AsyncMock(side_effect=failing_get)
+
+    client = FireflyClient(
+        base_url="http://test",
+        token="token",
+        client=mock_client,
+        categories_cache_ttl=60,
+    )
+
+    results = await asyncio.gather(*(client.get_categories() for _ in range(5)))
+    assert results == [[]] * 5
+    assert mock_client.get.call_count == 1
+
+    with pytest.raises(RuntimeError):
+        await client.get_categories(raise_on_error=True)
+    assert mock_client.get.call_count == 2
+
 @pytest.mark.anyio
 async def test_train_endpoint_chunking() -> None:
     """Test that the /train endpoint processes chunks."""
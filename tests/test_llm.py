@@ -1,10 +1,19 @@
+import asyncio
+import json
+import time
 from collections.abc import Generator
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
+from openai import RateLimitError
 
-from firefly_categorizer.classifiers.llm import LLMClassifier
+from firefly_categorizer.classifiers.cache import SemanticCache
+from firefly_categorizer.classifiers.llm import RATE_LIMIT_RETRIES, LLMClassifier
+from firefly_categorizer.classifiers.rate_limit import TokenBucket
 from firefly_categorizer.models import Transaction
 
 
@@ -31,3 +40,216 @@ def test_llm_classify(mock_openai_client: MagicMock) -> None:
 
     # Verify call
     mock_instance.responses.create.assert_called_once()
+
+
+
+def test_llm_prompt_prefix_is_stable(mock_openai_client: MagicMock) -> None:
+    mock_instance = mock_openai_client.return_value
+    mock_instance.responses.create.return_value = MagicMock(output_text="Groceries")
+
+    classifier = LLMClassifier(api_key="sk-fake", model="gpt-4")
+    classifier.classify(Transaction(description="Whole Foods", amount=10.0, date=datetime.now()), ["Rent", "Groceries"])
+    classifier.classify(Transaction(description="Aldi", amount=20.0, date=datetime.now()), ["Groceries", "Rent"])
+
+    first, second = (call.kwargs for call in mock_instance.responses.create.call_args_list)
+    assert first["instructions"] == second["instructions"]
+    assert "Groceries, Rent" in first["instructions"]
+    assert first["extra_body"]["prompt_cache_key"] == second["extra_body"]["prompt_cache_key"]
+    assert first["input"].startswith("Transaction: Whole Foods")
+
+def test_llm_prompt_cache_key_only_sent_to_openai(
+    mock_openai_client: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    mock_instance = mock_openai_client.return_value
+    mock_instance.responses.create.return_value = MagicMock(output_text="Groceries")
+    t = Transaction(description="Whole Foods", amount=10.0, date=datetime.now())
+
+    LLMClassifier(api_key="sk-fake", model="gpt-4", base_url="https://api.openai.com/v1").classify(t)
+    LLMClassifier(api_key="sk-fake", model="llama3", base_url="http://localhost:11434/v1").classify(t)
+
+    openai_call, compatible_call = (call.kwargs for call in mock_instance.responses.create.call_args_list)
+    assert "prompt_cache_key" in openai_call["extra_body"]
+    assert "extra_body" not in compatible_call
+    assert "prompt_cache_key" not in compatible_call
+
+def _batch_output_line(custom_id: str, text: str) -> str:
+    body = {
+        "id": f"resp_{custom_id}",
+        "object": "response",
+        "created_at": 0,
+        "model": "gpt-4",
+        "output": [{
+            "type": "message",
+            "id": f"msg_{custom_id}",
+            "status": "completed",
+            "role": "assistant",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": body}})
+
+
+def test_llm_classify_many_uses_batch_api(mock_openai_client: MagicMock) -> None:
+    mock_instance = mock_openai_client.return_value
+    mock_instance.files.create.return_value = MagicMock(id="file-in")
+    mock_instance.batches.create.return_value = MagicMock(id="batch-1", status="in_progress")
+    mock_instance.batches.retrieve.return_value = MagicMock(
+        id="batch-1", status="completed", output_file_id="file-out"
+    )
+    # Output lines arrive in any order and are matched back by custom_id
+    mock_instance.files.content.return_value = MagicMock(text="\n".join([
+        _batch_output_line("1", "Dining"),
+        _batch_output_line("0", "Groceries"),
+        _batch_output_line("2", "Travel"),
+    ]))
+
+    classifier = LLMClassifier(api_key="sk-fake", model="gpt-4")
+    transactions = [
+        Transaction(description=description, amount=10.0, date=datetime.now())
+        for description in ("Whole Foods", "Cafe", "Airline")
+    ]
+
+    results = classifier.classify_many(
+        transactions,
+        valid_categories=["Groceries", "Dining"],
+        poll_interval=0,
+    )
+
+    assert [result.category.name if result else None for result in results] == ["Groceries", "Dining", None]
+    mock_instance.responses.create.assert_not_called()
+    mock_instance.batches.create.assert_called_once()
+    assert mock_instance.batches.create.call_args.kwargs["endpoint"] == "/v1/responses"
+
+
+@pytest.mark.anyio
+async def test_llm_aclassify_many_runs_concurrently(mock_openai_client: MagicMock) -> None:
+    in_flight = 0
+    peak = 0
+
+    async def create(**kwargs: Any) -> MagicMock:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        response = MagicMock()
+        response.output_text = "Groceries" if "Whole Foods" in kwargs["input"] else "Unknown"
+        return response
+
+    with patch("firefly_categorizer.classifiers.llm.AsyncOpenAI") as mock_async_client:
+        mock_async_client.return_value.responses.create = AsyncMock(side_effect=create)
+        classifier = LLMClassifier(api_key="sk-fake", model="gpt-4", max_workers=2)
+        transactions = [
+            Transaction(description=description, amount=10.0, date=datetime.now())
+            for description in ("Whole Foods", "Cafe", "Whole Foods", "Airline")
+        ]
+
+        results = await classifier.aclassify_many(transactions, valid_categories=["Groceries"])
+
+    assert [result.category.name if result else None for result in results] == [
+        "Groceries", None, "Groceries", None
+    ]
+    assert peak == 2
+
+
+def test_llm_retries_rate_limits_then_gives_up(mock_openai_client: MagicMock) -> None:
+    mock_instance = mock_openai_client.return_value
+    response = httpx.Response(429, request=httpx.Request("POST", "http://test"))
+    rate_limited = RateLimitError("slow down", response=response, body=None)
+    mock_instance.responses.create.side_effect = [rate_limited, MagicMock(output_text="Groceries")]
+
+    classifier = LLMClassifier(api_key="sk-fake", model="gpt-4")
+    t = Transaction(description="Whole Foods", amount=100.0, date=datetime.now())
+    with patch("firefly_categorizer.classifiers.llm.time.sleep") as sleep:
+        res = classifier.classify(t)
+        assert res is not None
+        assert res.category.name == "Groceries"
+
+        mock_instance.responses.create.reset_mock()
+        mock_instance.responses.create.side_effect = rate_limited
+        assert classifier.classify(Transaction(description="Aldi", amount=1.0, date=datetime.now())) is None
+
+    assert mock_instance.responses.create.call_count == RATE_LIMIT_RETRIES + 1
+    assert sleep.call_count == 1 + RATE_LIMIT_RETRIES
+
+def test_token_bucket_paces_and_adapts() -> None:
+    bucket = TokenBucket(capacity=2, refill_per_sec=100.0)
+
+    started = time.monotonic()
+    for _ in range(4):
+        bucket.acquire(1)
+    # Two tokens were available up front; the other two wait for refill (~10ms each)
+    assert time.monotonic() - started >= 0.015
+
+    bucket.throttle()
+    assert bucket.refill_per_sec == pytest.approx(80.0)
+    for _ in range(10):
+        bucket.recover()
+    assert bucket.refill_per_sec == pytest.approx(100.0)
+
+
+def test_llm_classify_reuses_identical_requests(mock_openai_client: MagicMock) -> None:
+    mock_instance = mock_openai_client.return_value
+    mock_response = MagicMock()
+    mock_response.output_text = "Coffee"
+    mock_instance.responses.create.return_value = mock_response
+
+    classifier = LLMClassifier(api_key="sk-fake", model="gpt-4")
+    t = Transaction(description="STARBUCKS #123", amount=4.5, date=datetime(2024, 1, 1))
+
+    first = classifier.classify(t)
+    second = classifier.classify(t)
+
+    assert first is not None and first.source == "llm"
+    assert second is not None and second.source == "llm_cache"
+    assert second.category.name == "Coffee"
+    mock_instance.responses.create.assert_called_once()
+
+
+def test_llm_semantic_cache_reuses_similar_descriptions(mock_openai_client: MagicMock) -> None:
+    mock_instance = mock_openai_client.return_value
+    mock_response = MagicMock()
+    mock_response.output_text = "Coffee"
+    mock_instance.responses.create.return_value = mock_response
+    vectors = {
+        "STARBUCKS #123 SEATTLE": [1.0, 0.05, 0.0],
+        "STARBUCKS #456 PORTLAND": [1.0, 0.1, 0.0],
+        "SHELL GAS STATION": [0.0, 0.0, 1.0],
+    }
+
+    def embed(model: str, input: list[str]) -> MagicMock:
+        return MagicMock(data=[MagicMock(index=0, embedding=vectors[input[0]])])
+
+    mock_instance.embeddings.create.side_effect = embed
+
+    classifier = LLMClassifier(api_key="sk-fake", model="gpt-4", semantic_cache_threshold=0.95)
+    date = datetime(2024, 1, 1)
+
+    first = classifier.classify(Transaction(description="STARBUCKS #123 SEATTLE", amount=4.5, date=date))
+    similar = classifier.classify(Transaction(description="STARBUCKS #456 PORTLAND", amount=5.0, date=date))
+    different = classifier.classify(Transaction(description="SHELL GAS STATION", amount=40.0, date=date))
+
+    assert first is not None and first.source == "llm"
+    assert similar is not None and similar.source == "llm_semcache"
+    assert similar.category.name == "Coffee"
+    assert different is not None and different.source == "llm"
+    assert mock_instance.responses.create.call_count == 2
+
+
+def test_semantic_cache_persists_vectors(tmp_path: Path) -> None:
+    cache = SemanticCache(threshold=0.9)
+    cache.add([1.0, 0.0, 0.0], "Groceries")
+    cache.add([0.0, 1.0, 0.0], "Transport")
+    cache.save(str(tmp_path / "semantic_cache"), tag="embed-a")
+
+    restored = SemanticCache(threshold=0.9)
+    assert restored.load(str(tmp_path / "semantic_cache"), tag="embed-a")
+    assert len(restored) == 2
+    assert restored.lookup([0.99, 0.05, 0.0]) == "Groceries"
+    assert restored.lookup([0.0, 0.0, 1.0]) is None
+
+    assert not SemanticCache(threshold=0.9).load(str(tmp_path / "semantic_cache"), tag="embed-b")
@@ -1,6 +1,7 @@
+import threading
 from collections.abc import Generator
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -59,3 +60,24 @@ def test_manager_orchestration_priority(mock_classifiers: tuple[MagicMock, Magic
     assert res is not None
     assert res.category.name == "LLMCat"
     assert res.source == "llm"
+
+@pytest.mark.anyio
+async def test_manager_refresh_llm_closes_replaced_classifier(
+    mock_classifiers: tuple[MagicMock, MagicMock, MagicMock]
+) -> None:
+    _, _, mock_llm_cls = mock_classifiers
+    old_llm, new_llm = MagicMock(), MagicMock()
+    old_llm.aclient.close = AsyncMock()
+    save_threads: list[int] = []
+    old_llm.save_semantic_cache.side_effect = lambda: save_threads.append(threading.get_ident())
+    mock_llm_cls.side_effect = [old_llm, new_llm]
+
+    service = CategorizerService(data_dir=".")
+    await service.refresh_llm()
+
+    assert service.llm is new_llm
+    assert service.classifiers[-1] is new_llm
+    assert save_threads and save_threads[0] != threading.get_ident()
+    old_llm.client.close.assert_called_once()
+    old_llm.aclient.close.assert_awaited_once()
+    new_llm.client.close.assert_not_called()
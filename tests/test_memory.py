@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from pathlib import Path
 
@@ -9,7 +10,7 @@ from firefly_categorizer.models import Category, Transaction
 
 @pytest.fixture
 def memory_matcher(tmp_path: Path) -> MemoryMatcher:
-    data_file = tmp_path / "memory.json"
+    data_file = tmp_path / "memory.sqlite"
     return MemoryMatcher(data_path=str(data_file), threshold=50.0)
 
 def test_memory_learn_and_exact_match(memory_matcher: MemoryMatcher) -> None:
@@ -45,3 +46,47 @@ def test_memory_no_match(memory_matcher: MemoryMatcher) -> None:
     t1 = Transaction(description="Unknown Transaction", amount=100.0, date=datetime.now())
     res = memory_matcher.classify(t1)
     assert res is None
+
+def test_memory_imports_legacy_json(tmp_path: Path) -> None:
+    (tmp_path / "memory.json").write_text(json.dumps({"Netflix": "Subscriptions"}))
+
+    matcher = MemoryMatcher(data_path=str(tmp_path / "memory.sqlite"))
+    assert matcher.memory == {"Netflix": "Subscriptions"}
+
+    matcher.learn(Transaction(description="Rewe", amount=5.0, date=datetime.now()), Category(name="Food"))
+    matcher.close()
+
+    reopened = MemoryMatcher(data_path=str(tmp_path / "memory.sqlite"))
+    assert reopened.memory == {"Netflix": "Subscriptions", "Rewe": "Food"}
+
+def test_memory_fuzzy_match_in_large_memory(memory_matcher: MemoryMatcher) -> None:
+    for i in range(200):
+        memory_matcher.learn(
+            Transaction(description=f"Card payment shop {i:03d}", amount=1.0, date=datetime.now()),
+            Category(name="Shopping"),
+        )
+    memory_matcher.learn(Transaction(description="Spotify Premium", amount=9.99, date=datetime.now()),
+                         Category(name="Subscriptions"))
+
+    res = memory_matcher.classify(Transaction(description="Spotify Premium Family", amount=9.99, date=datetime.now()))
+    assert res is not None
+    assert res.category.name == "Subscriptions"
+    assert res.source == "memory_fuzzy"
+
+def test_memory_results_share_category_instances(memory_matcher: MemoryMatcher) -> None:
+    t = Transaction(description="Spotify Premium", amount=10.99, date=datetime.now())
+    memory_matcher.learn(t, Category(name="Subscriptions"))
+
+    first, second = memory_matcher.classify(t), memory_matcher.classify(t)
+    assert first is not None and second is not None
+    assert first.category is second.category
+
+def test_memory_exact_match_ignores_case_and_spacing(memory_matcher: MemoryMatcher) -> None:
+    memory_matcher.learn(Transaction(description="Amazon.com", amount=20.0, date=datetime.now()),
+                         Category(name="Shopping"))
+
+    res = memory_matcher.classify(Transaction(description="  AMAZON.COM ", amount=20.0, date=datetime.now()))
+    assert res is not None
+    assert res.category.name == "Shopping"
+    assert res.confidence == 1.0
+    assert res.source == "memory_exact"
@@ -1,15 +1,18 @@
+import pickle
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
+import numpy as np
 import pytest
 
-from firefly_categorizer.classifiers.tfidf import TfidfClassifier
+from firefly_categorizer.classifiers.tfidf import HASH_FEATURES, TfidfClassifier
 from firefly_categorizer.models import Category, Transaction
 
 
 @pytest.fixture
 def tfidf_classifier(tmp_path: Path) -> TfidfClassifier:
-    data_file = tmp_path / "tfidf.pkl"
+    data_file = tmp_path / "tfidf.npz"
     return TfidfClassifier(data_path=str(data_file), threshold=0.5)
 
 def test_tfidf_learn_and_classify(tfidf_classifier: TfidfClassifier) -> None:
@@ -46,10 +49,99 @@ def test_tfidf_persistence(tfidf_classifier: TfidfClassifier, tmp_path: Path) ->
     t2 = Transaction(description="Salary", amount=1000.0, date=datetime.now())
     c2 = Category(name="Income")
     tfidf_classifier.learn(t2, c2)
+    tfidf_classifier.flush()
 
     # Create new instance pointing to same file
-    data_file = tmp_path / "tfidf.pkl"
+    data_file = tmp_path / "tfidf.npz"
     new_classifier = TfidfClassifier(data_path=str(data_file))
 
     assert new_classifier.is_fitted
     assert len(new_classifier.examples) == 2
+
+def test_tfidf_matches_pipeline_probabilities(tfidf_classifier: TfidfClassifier) -> None:
+    samples = [
+        ("Rewe Markt", "Food"),
+        ("Aldi Sued", "Food"),
+        ("Deutsche Bahn", "Transport"),
+        ("Shell Tankstelle", "Car"),
+    ]
+    for desc, name in samples:
+        tfidf_classifier.learn(Transaction(description=desc, amount=10.0, date=datetime.now()), Category(name=name))
+
+    descriptions = ["Rewe City", "Bahn Ticket", "Unknown Shop"]
+    expected = tfidf_classifier.clf.predict_proba(tfidf_classifier.vectorizer.transform(descriptions))
+    assert tfidf_classifier._predict_proba(descriptions) == pytest.approx(expected)
+
+    transactions = [Transaction(description=d, amount=1.0, date=datetime.now()) for d in descriptions]
+    assert tfidf_classifier.classify_many(transactions) == [tfidf_classifier.classify(t) for t in transactions]
+
+def test_tfidf_learns_known_categories_incrementally(tfidf_classifier: TfidfClassifier) -> None:
+    food, transport, subs = Category(name="Food"), Category(name="Transport"), Category(name="Subs")
+    tfidf_classifier.learn(Transaction(description="Rewe Markt", amount=10.0, date=datetime.now()), food)
+    tfidf_classifier.learn(Transaction(description="Deutsche Bahn", amount=10.0, date=datetime.now()), transport)
+    assert tfidf_classifier.is_fitted
+
+    with patch.object(tfidf_classifier, "_fit", wraps=tfidf_classifier._fit) as full_fit:
+        tfidf_classifier.learn(Transaction(description="Aldi Sued", amount=10.0, date=datetime.now()), food)
+        full_fit.assert_not_called()
+        tfidf_classifier.learn(Transaction(description="Netflix", amount=10.0, date=datetime.now()), subs)
+        full_fit.assert_called_once()
+
+    assert list(tfidf_classifier.clf.classes_) == ["Food", "Subs", "Transport"]
+
+def test_tfidf_load_reuses_saved_model(tfidf_classifier: TfidfClassifier, tmp_path: Path) -> None:
+    tfidf_classifier.learn(Transaction(description="Netflix", amount=10.0, date=datetime.now()), Category(name="Subs"))
+    tfidf_classifier.learn(Transaction(description="Salary", amount=10.0, date=datetime.now()), Category(name="Income"))
+    tfidf_classifier.flush()
+
+    with patch.object(TfidfClassifier, "_fit") as full_fit:
+        reloaded = TfidfClassifier(data_path=str(tmp_path / "tfidf.npz"))
+        full_fit.assert_not_called()
+
+    assert reloaded.is_fitted
+    descriptions = ["Netflix Abo", "Salary March"]
+    assert reloaded._predict_proba(descriptions) == pytest.approx(tfidf_classifier._predict_proba(descriptions))
+
+@pytest.mark.parametrize("corruption", ["truncated", "missing_key"])
+def test_tfidf_corrupt_weights_keep_examples(
+    tfidf_classifier: TfidfClassifier, tmp_path: Path, corruption: str
+) -> None:
+    tfidf_classifier.learn(Transaction(description="Netflix", amount=10.0, date=datetime.now()), Category(name="Subs"))
+    tfidf_classifier.learn(Transaction(description="Salary", amount=10.0, date=datetime.now()), Category(name="Income"))
+    tfidf_classifier.flush()
+
+    weights_file = tmp_path / "tfidf.npz"
+    if corruption == "truncated":
+        weights_file.write_bytes(weights_file.read_bytes()[:64])
+    else:
+        np.savez(weights_file, coef_shape=np.array([2, HASH_FEATURES]))
+
+    reloaded = TfidfClassifier(data_path=str(weights_file))
+
+    assert reloaded.examples == ["Netflix", "Salary"]
+    assert reloaded.labels == ["Subs", "Income"]
+    assert reloaded.is_fitted
+
+def test_tfidf_learn_defers_saving(tfidf_classifier: TfidfClassifier, tmp_path: Path) -> None:
+    data_file = tmp_path / "tfidf.npz"
+    tfidf_classifier.learn(Transaction(description="Netflix", amount=10.0, date=datetime.now()), Category(name="Subs"))
+    tfidf_classifier.learn(Transaction(description="Salary", amount=10.0, date=datetime.now()), Category(name="Income"))
+    assert tfidf_classifier.is_fitted
+    assert not data_file.exists()
+
+    tfidf_classifier.flush()
+    assert data_file.exists()
+    assert TfidfClassifier(data_path=str(data_file)).examples == ["Netflix", "Salary"]
+
+def test_tfidf_migrates_legacy_pickle(tmp_path: Path) -> None:
+    with open(tmp_path / "tfidf.pkl", "wb") as f:
+        pickle.dump({"examples": ["Netflix", "Salary"], "labels": ["Subs", "Income"]}, f)
+
+    classifier = TfidfClassifier(data_path=str(tmp_path / "tfidf.npz"))
+    assert classifier.is_fitted
+    classifier.save()
+
+    reloaded = TfidfClassifier(data_path=str(tmp_path / "tfidf.npz"))
+    assert reloaded.examples == ["Netflix", "Salary"]
+    assert list(reloaded.clf.classes_) == ["Income", "Subs"]
+    assert reloaded._predict_proba(["Netflix"]) == pytest.approx(classifier._predict_proba(["Netflix"]))
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+import pytest
+
+from firefly_categorizer.domain.transactions import build_transaction_snapshot, transaction_json
+from firefly_categorizer.models import Transaction
+
+
+@pytest.mark.parametrize(
+    "date",
+    ["2024-01-02", "2024-01-02T03:04:05Z", "2024-01-02T03:04:05.000001+01:00", "2024-01-02T03:04:05-05:30"],
+)
+def test_transaction_json_matches_pydantic(date: str) -> None:
+    fields = {"description": "Café ☕", "amount": -3.5, "date": datetime.fromisoformat(date), "currency": "USD"}
+    expected = Transaction(**fields).model_dump_json()
+    assert transaction_json(**fields) == expected
+
+
+def test_snapshot_raw_json_matches_transaction() -> None:
+    snapshot = build_transaction_snapshot({
+        "id": "7",
+        "attributes": {"transactions": [{"description": "Rent", "amount": "950.00", "date": "2024-03-01T00:00:00Z"}]},
+    })
+    assert snapshot.raw_json == snapshot.transaction.model_dump_json()
+    assert snapshot.raw_json is snapshot.raw_json